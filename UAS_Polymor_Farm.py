@@ -1,10 +1,26 @@
 import pygame
 import sys
 import random
+import argparse
+import csv
+import hashlib
+import heapq
+import io
+import json
+import math
+import os
+import queue
+import struct
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
 from abc import ABC, abstractmethod
 
-# Inisialisasi Pygame
-pygame.init()
+try:
+    import numpy as np  # Opsional - hanya untuk HerdStore (backend vectorized)
+except ImportError:
+    np = None
 
 # Konstanta
 WIDTH, HEIGHT = 1200, 800
@@ -25,14 +41,327 @@ GRASS_GREEN = (124, 252, 0)
 DARK_GREEN = (0, 100, 0)
 GRAY = (160, 160, 160)
 
-# Setup
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Polymor-Farm: The Shape-Shifting Farm")
-clock = pygame.time.Clock()
-font_small = pygame.font.Font(None, 28)
-font_medium = pygame.font.Font(None, 36)
-font_large = pygame.font.Font(None, 56)
-font_title = pygame.font.Font(None, 72)
+
+class LazyFont:
+    """
+    Font yang baru di-load saat pertama kali dipakai untuk render.
+    pygame.font juga baru di-init saat itu, jadi import module, headless
+    dan tooling tidak membayar biaya font sama sekali.
+    """
+    __slots__ = ("size", "_font")
+    
+    def __init__(self, size):
+        self.size = size
+        self._font = None
+    
+    def get(self):
+        if self._font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self._font = pygame.font.Font(None, self.size)
+        return self._font
+    
+    def render(self, text, antialias, color):
+        return self.get().render(text, antialias, color)
+
+
+# Setup - window baru dibuat di init_display(), bukan saat import,
+# supaya Farm(headless=True) bisa jalan tanpa display (CI, server, worker)
+screen = None  # Render target logis WIDTH x HEIGHT (semua draw ke sini)
+viewport = None  # Viewport: scaling screen -> window + mapping input
+clock = None
+font_small = LazyFont(28)
+font_medium = LazyFont(36)
+font_large = LazyFont(56)
+font_title = LazyFont(72)
+
+# Satu tick simulasi = satu frame pada FPS normal
+TICK_MS = 1000 / FPS
+TICKS_PER_DAY = 5000  # time_of_day naik 0.2 per tick sampai 1000
+PRODUCT_TICKS = 300  # Jarak antar produce() - LEBIH CEPAT!
+MESSAGE_TICKS = 180  # Lama notifikasi tampil
+
+
+def init_display(window_size=None, smooth=False):
+    """
+    Buka window dan clock (sekali saja). Hanya subsystem display yang di-init -
+    bukan pygame.init() yang ikut menyalakan audio dan joystick yang tidak dipakai.
+    Font di-load belakangan oleh LazyFont.
+    window_size = ukuran window (default = ukuran logis); game tetap digambar
+    di WIDTH x HEIGHT lalu di-scale ke window (smooth = smoothscale).
+    """
+    global screen, clock, viewport
+    if screen is not None:
+        return screen
+    
+    pygame.display.init()
+    window = pygame.display.set_mode(window_size or (WIDTH, HEIGHT), pygame.RESIZABLE)
+    pygame.display.set_caption("Polymor-Farm: The Shape-Shifting Farm")
+    clock = pygame.time.Clock()
+    viewport = Viewport(window, smooth=smooth)
+    screen = viewport.surface
+    return screen
+
+
+def resize_display():
+    """Window di-resize: hitung ulang scaling, render target logis tetap"""
+    global screen
+    screen = viewport.resize(pygame.display.get_surface())
+    return screen
+
+
+def present(rects=None):
+    """Tampilkan frame: rects = area logis yang berubah (None = seluruh layar)"""
+    if viewport is not None:
+        viewport.present(rects)
+
+
+# ==================== VIEWPORT (RENDER TARGET) ====================
+class Viewport:
+    """
+    Render target logis ukuran tetap (WIDTH x HEIGHT) yang di-scale sekali ke
+    window - window kecil di PC lab yang lemah atau besar/HiDPI, layout dan
+    biaya render game tetap sama. Letterbox kalau rasio window berbeda.
+    Posisi mouse dari window dipetakan balik lewat to_logical().
+    Kalau window sama dengan ukuran logis, game langsung menggambar ke display.
+    """
+    def __init__(self, window, logical_size=(WIDTH, HEIGHT), smooth=False):
+        self.logical_size = tuple(logical_size)
+        self.smooth = smooth
+        self._offscreen = None  # Render target saat window != ukuran logis
+        self.resize(window)
+    
+    def resize(self, window):
+        """Hitung scale + letterbox untuk window; return render target logis"""
+        self.window = window
+        logical_w, logical_h = self.logical_size
+        window_w, window_h = window.get_size()
+        self.scale = min(window_w / logical_w, window_h / logical_h)
+        self.rect = pygame.Rect(0, 0, round(logical_w * self.scale), round(logical_h * self.scale))
+        self.rect.center = window.get_rect().center
+        self.direct = self.rect.size == self.logical_size and self.rect.topleft == (0, 0)
+        if self.direct:
+            self.surface = window
+            self._target = None
+        else:
+            if self._offscreen is None:
+                self._offscreen = pygame.Surface(self.logical_size).convert()
+            self.surface = self._offscreen
+            window.fill(BLACK)  # Letterbox
+            self._target = window.subsurface(self.rect)
+        return self.surface
+    
+    def to_logical(self, pos):
+        """Posisi window (mouse) -> koordinat logis game"""
+        if self.direct:
+            return pos
+        return (int((pos[0] - self.rect.x) / self.scale),
+                int((pos[1] - self.rect.y) / self.scale))
+    
+    def to_window_rect(self, rect):
+        """Rect logis -> rect window yang menutupinya"""
+        left = self.rect.x + int(rect.left * self.scale)
+        top = self.rect.y + int(rect.top * self.scale)
+        right = self.rect.x + math.ceil(rect.right * self.scale)
+        bottom = self.rect.y + math.ceil(rect.bottom * self.scale)
+        return pygame.Rect(left, top, right - left, bottom - top)
+    
+    def present(self, rects=None):
+        """
+        Scale render target ke window lalu update display. Scale bulat (2x HiDPI)
+        tanpa smooth: hanya rect kotor yang di-scale (replikasi pixel, hasil
+        identik). Selain itu satu pass scale untuk seluruh frame.
+        """
+        if self.direct:
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+            return
+        
+        factor = int(self.scale)
+        if rects is not None and not self.smooth and factor == self.scale:
+            updated = []
+            for rect in rects:
+                target = pygame.Rect(rect.x * factor, rect.y * factor, rect.w * factor, rect.h * factor)
+                pygame.transform.scale(self.surface.subsurface(rect), target.size,
+                                       self._target.subsurface(target))
+                updated.append(target.move(self.rect.topleft))
+            pygame.display.update(updated)
+            return
+        
+        scale = pygame.transform.smoothscale if self.smooth else pygame.transform.scale
+        scale(self.surface, self.rect.size, self._target)
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update([self.to_window_rect(rect) for rect in rects])
+
+
+# ==================== TEXT CACHE ====================
+class TextCache:
+    """
+    Cache LRU untuk Surface hasil font.render.
+    Key = (font, text, color, antialias), jadi label statis cukup di-render
+    sekali dan counter dinamis hanya di-render ulang saat nilainya berubah.
+    """
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+    
+    def __len__(self):
+        return len(self._surfaces)
+    
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)  # Buang yang paling lama tidak dipakai
+        return surface
+    
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    def clear(self):
+        self._surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+text_cache = TextCache()
+
+
+def render_text(font, text, color, antialias=True):
+    """Pengganti font.render yang lewat text_cache (Surface jangan diubah!)"""
+    return text_cache.render(font, text, color, antialias)
+
+
+# ==================== SPRITE CACHE ====================
+SPRITE_PADDING = 50  # Kanvas bake: ruang untuk kepala/tanduk yang keluar (lalu di-crop)
+STATUS_BAR_HEIGHT = 6
+LOD_FULL = 0    # Sprite lengkap + shadow + status bar + label
+LOD_SIMPLE = 1  # Siluet saja (satu blit), tanpa status bar dan teks
+
+
+class SpriteCache:
+    """
+    Cache LRU untuk Surface yang di-bake sekali lalu cuma di-blit:
+    badan hewan per (species, form, size, warna), shadow, ring seleksi
+    dan status bar. Builder hanya dipanggil saat key belum ada.
+    """
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+    
+    def __len__(self):
+        return len(self._surfaces)
+    
+    def get(self, key, builder):
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = builder()
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+    
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    def clear(self):
+        self._surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+sprite_cache = SpriteCache()
+
+
+def _convert_alpha(surface):
+    """convert_alpha butuh display mode - tanpa window, pakai surface apa adanya"""
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        return surface.convert_alpha()
+    return surface
+
+
+def get_shadow_sprite(size):
+    """Shadow elips di bawah hewan (sekarang benar-benar transparan)"""
+    def bake():
+        shadow = pygame.Surface((size - 10, 15), pygame.SRCALPHA)
+        pygame.draw.ellipse(shadow, (0, 0, 0, 50), shadow.get_rect())
+        return _convert_alpha(shadow)
+    return sprite_cache.get(("shadow", size), bake)
+
+
+def get_ring_sprite(radius):
+    """Lingkaran kuning penanda hewan yang dipilih"""
+    def bake():
+        ring = pygame.Surface((radius * 2 + 2, radius * 2 + 2), pygame.SRCALPHA)
+        pygame.draw.circle(ring, YELLOW, (radius + 1, radius + 1), radius, 3)
+        return _convert_alpha(ring)
+    return sprite_cache.get(("ring", radius), bake)
+
+
+def get_silhouette_sprite(radius, color):
+    """Siluet LOD: lingkaran warna badan dengan outline hitam"""
+    def bake():
+        silhouette = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(silhouette, color, (radius, radius), radius)
+        pygame.draw.circle(silhouette, BLACK, (radius, radius), radius, 1)
+        return _convert_alpha(silhouette)
+    return sprite_cache.get(("silhouette", radius, color), bake)
+
+
+panel_cache = SpriteCache(maxsize=64)  # Panel UI - terpisah supaya tidak terdesak sprite herd
+
+
+def get_panel(key, size, fill, radius=0, border=None, border_width=0, draw=None):
+    """
+    Panel UI translucent (per-pixel alpha) yang di-bake sekali ke panel_cache:
+    background rounded dengan alpha, border, lalu isi statis lewat draw(panel)
+    dengan koordinat relatif panel. key harus ikut berubah kalau isi statisnya
+    berubah; teks dinamis di-blit pemanggil di atas panel setiap frame.
+    """
+    def bake():
+        panel = pygame.Surface(size, pygame.SRCALPHA)
+        rect = panel.get_rect()
+        pygame.draw.rect(panel, fill, rect, border_radius=radius)
+        if border is not None:
+            pygame.draw.rect(panel, border, rect, border_width, border_radius=radius)
+        if draw is not None:
+            draw(panel)
+        return _convert_alpha(panel)
+    return panel_cache.get((key, tuple(size)), bake)
+
+
+def get_bar_sprite(width, fill_width, color):
+    """Satu status bar: background BROWN + isi sepanjang fill_width pixel"""
+    def bake():
+        bar = pygame.Surface((width, STATUS_BAR_HEIGHT))
+        bar.fill(BROWN)
+        if fill_width > 0:
+            bar.fill(color, (0, 0, fill_width, STATUS_BAR_HEIGHT))
+        return bar.convert() if pygame.display.get_surface() is not None else bar
+    return sprite_cache.get(("bar", width, fill_width, color), bake)
 
 
 # ==================== ENCAPSULATION ====================
@@ -42,13 +371,32 @@ class FarmEntity:
     Base class untuk semua entity di farm.
     Implementasi ENCAPSULATION dengan private attributes.
     """
+    # __slots__ = layout atribut tetap tanpa __dict__ per instance (hemat memori
+    # untuk herd besar). Nama __private tetap di-mangle seperti biasa.
+    __slots__ = ("__name", "__age", "__happiness", "__health", "__last_interaction",
+                 "__is_selected", "_x", "_y", "_prev_x", "_prev_y", "_size",
+                 "_herd", "_slot", "_grid", "_cell", "_scheduler", "_observer")
+    
     def __init__(self, name, x, y):
+        # Diisi HerdStore.bind() - kalau tidak None, state simulasi ada di array herd
+        self._herd = None
+        self._slot = -1
+        # Diisi SpatialGrid.insert() - cell tempat entity terdaftar
+        self._grid = None
+        self._cell = None
+        # Diisi Animal.attach_scheduler() - timer jadi event di EventScheduler
+        self._scheduler = None
+        # Diisi Farm.add_animal() - diberi tahu saat hewan transform / reset
+        self._observer = None
+        
         self.__name = name  # Private - tidak bisa diakses langsung
         self.__age = 0  # Private
         self.__happiness = 50  # Private - hidden mood (0-100)
         self.__health = 100  # Private
         self._x = x  # Protected
         self._y = y  # Protected
+        self._prev_x = x  # Posisi tick sebelumnya, untuk interpolasi render
+        self._prev_y = y
         self._size = 60
         self.__last_interaction = 0
         self.__is_selected = False
@@ -61,6 +409,8 @@ class FarmEntity:
         return self.__age
     
     def get_happiness(self):
+        if self._herd is not None:
+            return float(self._herd.happiness[self._slot])
         return self.__happiness
     
     def get_health(self):
@@ -75,7 +425,11 @@ class FarmEntity:
     # Setter methods dengan VALIDASI (ENCAPSULATION)
     def set_happiness(self, value):
         """Setter dengan validasi - happiness harus 0-100"""
-        self.__happiness = max(0, min(100, value))
+        value = max(0, min(100, value))
+        if self._herd is not None:
+            self._herd.happiness[self._slot] = value
+        else:
+            self.__happiness = value
         
     def set_health(self, value):
         """Setter dengan validasi - health harus 0-100"""
@@ -93,15 +447,46 @@ class FarmEntity:
         """Tambah umur - private method untuk internal use"""
         self.__age += 1
     
-    def interact(self):
+    def interact(self, now=None):
         """Interaksi dengan entity"""
-        self.__last_interaction = pygame.time.get_ticks()
+        self.__last_interaction = pygame.time.get_ticks() if now is None else now
+        if self._herd is not None:
+            self._herd.last_interaction[self._slot] = self.__last_interaction
     
-    def update(self):
-        """happiness - LEBIH LAMBAT"""
-        current_time = pygame.time.get_ticks()
+    def update(self, now=None, ticks=1):
+        """
+        happiness - LEBIH LAMBAT.
+        now = waktu dalam ms (default pygame ticks, mode headless pakai waktu simulasi)
+        ticks = jumlah tick yang disimulasikan sekaligus (hewan di luar kamera)
+        """
+        current_time = pygame.time.get_ticks() if now is None else now
         if current_time - self.__last_interaction > 15000: 
-            self.set_happiness(self.__happiness - 0.5)  
+            self.set_happiness(self.__happiness - 0.5 * ticks)  
+    
+    def _export_state(self):
+        """State simulasi sebagai dict (dipakai HerdStore dan snapshot save/load)"""
+        return {
+            "x": self._x,
+            "y": self._y,
+            "happiness": self.get_happiness(),
+            "health": self.__health,
+            "age": self.__age,
+            "last_interaction": self.__last_interaction,
+        }
+    
+    def _snapshot_row(self):
+        """Seperti _export_state tapi tuple (tanpa dict) - jalur cepat capture_snapshot"""
+        return (self._x, self._y, self.get_happiness(), self.__health, self.__age,
+                self.__last_interaction)
+    
+    def _import_state(self, state):
+        """Kebalikan _export_state - tulis balik state ke private attributes"""
+        self._x = self._prev_x = state["x"]
+        self._y = self._prev_y = state["y"]
+        self.__happiness = state["happiness"]
+        self.__health = state["health"]
+        self.__age = state["age"]
+        self.__last_interaction = state["last_interaction"]
     
     def check_click(self, mouse_pos):
         """Check if entity clicked"""
@@ -122,6 +507,14 @@ class Animal(FarmEntity):
     Animal class - inherit dari FarmEntity (INHERITANCE).
     Menambah functionality khusus untuk hewan.
     """
+    __slots__ = ("_base_color", "_current_color", "_species", "__hunger",
+                 "__is_transformed", "__products", "__product_count", "__product_timer", "__energy",
+                 "_movement_timer", "_target_x", "_target_y",
+                 "_retarget_event", "_produce_event", "_transform_notified", "_rng",
+                 "_pasture", "_sim_tick")
+    
+    species_def = None  # SpeciesDef dari registry (class attribute, di-set load_species)
+    
     def __init__(self, name, x, y, base_color, species):
         super().__init__(name, x, y)  # Panggil parent constructor
         self._base_color = base_color
@@ -129,37 +522,78 @@ class Animal(FarmEntity):
         self._species = species
         self.__hunger = 100  # Private - 0 = lapar, 100 = kenyang
         self.__is_transformed = False  # Untuk polymorphism
-        self.__products = []  # Produk yang dihasilkan (telur, susu, dll)
+        self.__products = ()  # Produk yang dihasilkan (tuple kosong bersama, tanpa alokasi list)
+        self.__product_count = 0  # Produk siap dikumpulkan (telur/susu/wol)
         self.__product_timer = 0
         self._movement_timer = 0
         self._target_x = x
         self._target_y = y
         self.__energy = 100  # Private
+        self._retarget_event = None
+        self._produce_event = None
+        self._transform_notified = False  # Notifikasi transform sudah ditampilkan
+        self._rng = random  # Diganti stream milik Farm di Farm.add_animal
+        self._pasture = DEFAULT_PASTURE  # (x0, x1, y0, y1) area jalan, dari Farm.world
+        self._sim_tick = 0  # Tick terakhir di-update (simulasi kasar di luar kamera)
     
     def get_hunger(self):
+        if self._herd is not None:
+            return float(self._herd.hunger[self._slot])
         return self.__hunger
     
     def get_species(self):
         return self._species
     
     def is_transformed(self):
+        if self._herd is not None:
+            return bool(self._herd.transformed[self._slot])
         return self.__is_transformed
     
     def get_products(self):
         """Return copy untuk protect internal list (ENCAPSULATION)"""
-        return self.__products.copy()
+        return list(self.__products)
+    
+    def get_product_count(self):
+        return self.__product_count
+    
+    def collect_products(self):
+        """Ambil semua produk dan reset counter"""
+        count = self.__product_count
+        self.__product_count = 0
+        return count
     
     def get_energy(self):
+        if self._herd is not None:
+            return float(self._herd.energy[self._slot])
         return self.__energy
     
+    def _set_hunger(self, value):
+        """Protected setter - tulis ke herd kalau hewan ini thin view"""
+        if self._herd is not None:
+            self._herd.hunger[self._slot] = value
+        else:
+            self.__hunger = value
+    
+    def _set_energy(self, value):
+        if self._herd is not None:
+            self._herd.energy[self._slot] = value
+        else:
+            self.__energy = value
+    
+    def _set_transformed(self, value):
+        if self._herd is not None:
+            self._herd.transformed[self._slot] = value
+        else:
+            self.__is_transformed = value
+    
     def feed(self, food_value):
         """
         Method untuk memberi makan (PUBLIC interface).
         Mengubah PRIVATE attribute dengan validasi.
         """
-        self.__hunger = min(100, self.__hunger + food_value)
+        self._set_hunger(min(100, self.get_hunger() + food_value))
         self.set_happiness(self.get_happiness() + 10)
-        self.__energy = min(100, self.__energy + 20)
+        self._set_energy(min(100, self.get_energy() + 20))
         
         # Cek transformasi (POLYMORPHISM akan terjadi!)
         self._check_transformation()
@@ -167,174 +601,312 @@ class Animal(FarmEntity):
     def pet(self):
         """Elus hewan untuk tambah happiness"""
         self.set_happiness(self.get_happiness() + 15)
-        self.__energy = min(100, self.__energy + 5)
+        self._set_energy(min(100, self.get_energy() + 5))
     
     def _check_transformation(self):
         """
         Protected method - cek apakah hewan harus transform.
         Ini akan trigger POLYMORPHISM di child class!
-        LEBIH MUDAH: happiness > 70 dan hunger > 70
+        Syarat dari species_def (default: happiness > 70 dan hunger > 70)
         """
-        if self.get_happiness() > 70 and self.__hunger > 70:  # Dari 80 jadi 70
-            if not self.__is_transformed:  # Baru transform
-                self.__is_transformed = True
-                self.transform()  # Polymorphism! Setiap hewan transform beda
+        rules = self.species_def
+        if self.get_happiness() > rules.min_happiness and self.get_hunger() > rules.min_hunger:
+            if not self.is_transformed():  # Baru transform
+                self._set_transformed(True)
+                self._apply_form(True)
         else:
-            if self.__is_transformed:  # Baru kembali normal
-                self.__is_transformed = False
-                self.reset_form()
+            if self.is_transformed():  # Baru kembali normal
+                self._set_transformed(False)
+                self._apply_form(False)
+    
+    def _apply_form(self, transformed):
+        """Jalankan transform()/reset_form() lalu kabari observer (Farm)"""
+        if transformed:
+            self.transform()  # Polymorphism! Setiap hewan transform beda
+        else:
+            self.reset_form()
+        if self._observer is not None:
+            self._observer._on_animal_form_change(self, transformed)
     
-    @abstractmethod
     def transform(self):
-        """Abstract - setiap hewan punya transformasi berbeda (POLYMORPHISM)"""
-        pass
+        """
+        Bentuk transform dari species_def (warna & ukuran).
+        Child class menambah efek sendiri lewat override (POLYMORPHISM).
+        """
+        rules = self.species_def
+        self._current_color = rules.transform_color or self._base_color
+        self._size = rules.transform_size
     
-    @abstractmethod
     def reset_form(self):
-        """Abstract - reset ke bentuk normal"""
-        pass
+        """Reset ke bentuk normal"""
+        self._current_color = self._base_color
+        self._size = self.species_def.size
     
-    @abstractmethod
     def produce(self):
-        """Abstract - setiap hewan produce produk berbeda"""
-        pass
+        """Tambah produk - jumlah per species dari registry (lebih banyak saat transform)"""
+        if self.get_hunger() > 50 and self.get_energy() > 30:
+            self.__product_count += self.species_def.yields[self.is_transformed()]
     
-    def update(self):
-        """Override parent update, tambah logic untuk animal"""
-        super().update()  # Panggil parent update
+    def update(self, now=None, ticks=1):
+        """
+        Override parent update, tambah logic untuk animal.
+        Hewan yang terikat HerdStore di-update lewat HerdStore.step().
+        ticks > 1 = beberapa tick sekaligus (Farm, untuk hewan di luar kamera).
+        """
+        super().update(now, ticks)  # Panggil parent update
         
         # Hunger berkurang over time - LEBIH LAMBAT
-        self.__hunger = max(0, self.__hunger - 0.05)  # Dari 0.1 jadi 0.05
-        self.__energy = max(0, self.__energy - 0.02)  # Dari 0.05 jadi 0.02
+        self.__hunger = max(0, self.__hunger - 0.05 * ticks)  # Dari 0.1 jadi 0.05
+        self.__energy = max(0, self.__energy - 0.02 * ticks)  # Dari 0.05 jadi 0.02
         
         # Happiness turun kalau lapar
         if self.__hunger < 30:
-            self.set_happiness(self.get_happiness() - 0.2)  # Lebih lambat
+            self.set_happiness(self.get_happiness() - 0.2 * ticks)  # Lebih lambat
         
         # Random movement (hewan bergerak sendiri) - LEBIH JARANG
-        self._movement_timer -= 1
-        if self._movement_timer <= 0:
-            self._target_x = random.randint(150, WIDTH - 150)
-            self._target_y = random.randint(250, HEIGHT - 200)
-            self._movement_timer = random.randint(180, 400)  # Lebih lama diam
+        # Kalau pakai EventScheduler, retarget & produce jalan sebagai event
+        if self._scheduler is None:
+            self._movement_timer -= ticks
+            if self._movement_timer <= 0:
+                self._retarget()
         
         # Move towards target - LEBIH LAMBAT
+        self._prev_x = self._x
+        self._prev_y = self._y
         dx = self._target_x - self._x
         dy = self._target_y - self._y
         distance = (dx**2 + dy**2)**0.5
         if distance > 2:
-            speed = 1.0  # Dari 1.5 jadi 1.0
+            speed = min(1.0 * ticks, distance)  # Dari 1.5 jadi 1.0 (per tick)
             self._x += (dx / distance) * speed
             self._y += (dy / distance) * speed
+            if self._grid is not None:
+                self._grid.update(self)
         
         # Production timer - LEBIH CEPAT!
-        self.__product_timer += 1
-        if self.__product_timer >= 300: 
-            self.produce()
-            self.__product_timer = 0
+        if self._scheduler is None:
+            self.__product_timer += ticks
+            if self.__product_timer >= PRODUCT_TICKS: 
+                self.produce()
+                self.__product_timer = 0
         
         # Update transformation
         self._check_transformation()
     
-    def draw_base(self, surface):
-        """Base drawing untuk semua animal"""
+    def _retarget(self):
+        """Pilih tujuan jalan baru dan berapa lama sampai retarget berikutnya"""
+        rng = self._rng
+        x0, x1, y0, y1 = self._pasture
+        self._target_x = rng.randint(x0, x1)
+        self._target_y = rng.randint(y0, y1)
+        self._movement_timer = rng.randint(180, 400)  # Lebih lama diam
+    
+    def attach_scheduler(self, scheduler):
+        """
+        Ganti timer per-frame (_movement_timer, product timer) dengan event
+        di scheduler, jadi tick tanpa event tidak perlu menghitung apa-apa.
+        """
+        self._scheduler = scheduler
+        # Timer t berarti retarget t tick lagi (minimal tick berikutnya)
+        self._retarget_event = scheduler.schedule(max(1, self._movement_timer),
+                                                  self._on_retarget_event)
+        self._produce_event = scheduler.schedule(PRODUCT_TICKS - self.__product_timer,
+                                                 self._on_produce_event)
+    
+    def _on_retarget_event(self):
+        self._retarget()
+        self._retarget_event = self._scheduler.schedule(self._movement_timer,
+                                                        self._on_retarget_event)
+    
+    def _on_produce_event(self):
+        self.produce()
+        self._produce_event = self._scheduler.schedule(PRODUCT_TICKS, self._on_produce_event)
+    
+    def _export_state(self):
+        state = super()._export_state()
+        movement_timer, product_timer = self._movement_timer, self.__product_timer
+        if self._scheduler is not None:
+            # Sisa timer dihitung dari jadwal event
+            now = self._scheduler.tick
+            movement_timer = self._retarget_event.due - now
+            product_timer = PRODUCT_TICKS - (self._produce_event.due - now)
+        state.update({
+            "target_x": self._target_x,
+            "target_y": self._target_y,
+            "hunger": self.get_hunger(),
+            "energy": self.get_energy(),
+            "movement_timer": movement_timer,
+            "product_timer": product_timer,
+            "transformed": self.is_transformed(),
+            "products": self.__product_count,
+        })
+        if self._herd is not None:
+            # Thin view: state terbaru ada di array HerdStore
+            state.update(self._herd.slot_state(self._slot))
+        return state
+    
+    def _snapshot_row(self):
+        """Kolom SNAPSHOT_COLUMNS (tanpa order) sebagai tuple"""
+        # Hewan di HerdStore: kolom array-nya ditimpa capture_snapshot per block
+        x, y, happiness, health, age, last_interaction = super()._snapshot_row()
+        movement_timer, product_timer = self._movement_timer, self.__product_timer
+        if self._scheduler is not None:
+            now = self._scheduler.tick
+            movement_timer = self._retarget_event.due - now
+            product_timer = PRODUCT_TICKS - (self._produce_event.due - now)
+        return (x, y, self._target_x, self._target_y, self.get_hunger(), self.get_energy(),
+                happiness, health, age, last_interaction, movement_timer, product_timer,
+                self.is_transformed(), self.__product_count)
+    
+    def _import_state(self, state):
+        super()._import_state(state)
+        self._target_x = state["target_x"]
+        self._target_y = state["target_y"]
+        self.__hunger = state["hunger"]
+        self.__energy = state["energy"]
+        self._movement_timer = state["movement_timer"]
+        self.__product_timer = state["product_timer"]
+        self.__is_transformed = state["transformed"]
+        self.__product_count = state["products"]
+        # Samakan tampilan (warna/ukuran) dengan form yang tersimpan
+        if self.__is_transformed:
+            self.transform()
+        else:
+            self.reset_form()
+    
+    @abstractmethod
+    def _draw_sprite(self, surface, x, y):
+        """Abstract - gambar badan hewan dengan titik tengah (x, y)"""
+        pass
+    
+    def _sprite_key(self):
+        """Semua yang mempengaruhi tampilan badan - sprite di-bake ulang kalau berubah"""
+        return (self._species, self.is_transformed(), self._size, self._current_color)
+    
+    def _bake_sprite(self):
+        """
+        Render badan sekali ke Surface transparan (dipanggil SpriteCache saat miss).
+        Kanvas di-crop ke pixel yang benar-benar tergambar, jadi blit dan dirty
+        rect hanya sebesar badan. Return (sprite, offset x, offset y) dari titik tengah.
+        """
+        half = self._size + SPRITE_PADDING
+        canvas = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+        self._draw_sprite(canvas, half, half)
+        bounds = canvas.get_bounding_rect()
+        sprite = _convert_alpha(canvas.subsurface(bounds).copy())
+        return (sprite, bounds.x - half, bounds.y - half)
+    
+    def _label_blits(self, x, y):
+        """Label teks di sekitar hewan: jumlah produk dan badge transform (dari registry)"""
+        rules = self.species_def
+        blits = []
+        if self.__product_count > 0:
+            text = render_text(font_small, f"{rules.product_label} ×{self.__product_count}", WHITE)
+            blits.append((text, (x + rules.label_offset[0], y + rules.label_offset[1])))
+        if self.is_transformed():
+            badge = render_text(font_small, rules.badge, rules.badge_color)
+            blits.append((badge, (x + rules.badge_offset[0], y + rules.badge_offset[1])))
+        return blits
+    
+    def get_render_position(self, alpha=1.0):
+        """Posisi interpolasi antara tick lalu (alpha 0) dan tick sekarang (alpha 1)"""
+        return (self._prev_x + (self._x - self._prev_x) * alpha,
+                self._prev_y + (self._y - self._prev_y) * alpha)
+    
+    def _silhouette_color(self):
+        """Warna siluet LOD (warna yang paling kelihatan dari badan)"""
+        return self._current_color
+    
+    def get_blits(self, alpha=1.0, detail=LOD_FULL, view=None):
+        """
+        Semua (Surface, posisi) untuk menggambar hewan ini, urut bawah ke atas.
+        Farm.draw menggabungkan punya semua hewan jadi satu Surface.blits.
+        alpha = posisi interpolasi antar tick simulasi (lihat FixedTimestep).
+        detail = LOD_SIMPLE -> siluet saja, kecuali hewan yang sedang dipilih.
+        view = (x, y, zoom) kamera (Camera.transform); zoom < 1 -> siluet kecil.
+        """
+        render_x, render_y = self.get_render_position(alpha)
+        zoom = 1.0
+        if view is not None:
+            view_x, view_y, zoom = view
+            render_x = (render_x - view_x) * zoom
+            render_y = (render_y - view_y) * zoom
+        x, y = int(render_x), int(render_y)
+        size = self._size
+        
+        if zoom != 1.0:
+            # Sprite detail hanya ada di ukuran asli; yang dipilih dapat cincin
+            radius = max(1, int(size * zoom) // 2)
+            blits = [(get_silhouette_sprite(radius, self._silhouette_color()), (x - radius, y - radius))]
+            if self.is_selected():
+                ring = get_ring_sprite(radius + 3)
+                blits.append((ring, (x - ring.get_width()//2, y - ring.get_height()//2)))
+            return blits
+        
+        if detail == LOD_SIMPLE and not self.is_selected():
+            radius = size // 2
+            return [(get_silhouette_sprite(radius, self._silhouette_color()), (x - radius, y - radius))]
+        
         # Shadow
-        shadow_rect = pygame.Rect(self._x - self._size//2 + 5, 
-                                 self._y + self._size//3, 
-                                 self._size - 10, 15)
-        pygame.draw.ellipse(surface, (0, 0, 0, 50), shadow_rect)
+        blits = [(get_shadow_sprite(size), (x - size//2 + 5, y + size//3))]
         
         # Selection indicator
         if self.is_selected():
-            pygame.draw.circle(surface, YELLOW, (int(self._x), int(self._y)), 
-                             self._size//2 + 5, 3)
-        
-        # Status bars di atas hewan
-        bar_width = self._size
-        bar_height = 6
-        bar_y = self._y - self._size//2 - 25
-        
-        # Health bar (RED)
-        pygame.draw.rect(surface, BROWN, 
-                        (self._x - bar_width//2, bar_y, bar_width, bar_height))
-        health_width = (self.get_health() / 100) * bar_width
-        pygame.draw.rect(surface, RED, 
-                        (self._x - bar_width//2, bar_y, health_width, bar_height))
-        
-        # Happiness bar (PINK)
-        bar_y += bar_height + 2
-        pygame.draw.rect(surface, BROWN, 
-                        (self._x - bar_width//2, bar_y, bar_width, bar_height))
-        happiness_width = (self.get_happiness() / 100) * bar_width
-        pygame.draw.rect(surface, PINK, 
-                        (self._x - bar_width//2, bar_y, happiness_width, bar_height))
-        
-        # Hunger bar (GREEN)
-        bar_y += bar_height + 2
-        pygame.draw.rect(surface, BROWN, 
-                        (self._x - bar_width//2, bar_y, bar_width, bar_height))
-        hunger_width = (self.__hunger / 100) * bar_width
-        pygame.draw.rect(surface, GREEN, 
-                        (self._x - bar_width//2, bar_y, hunger_width, bar_height))
+            ring = get_ring_sprite(size//2 + 5)
+            blits.append((ring, (x - ring.get_width()//2, y - ring.get_height()//2)))
+        
+        # Status bars di atas hewan: health (RED), happiness (PINK), hunger (GREEN)
+        bar_x = x - size//2
+        bar_y = y - size//2 - 25
+        for value, color in ((self.get_health(), RED),
+                             (self.get_happiness(), PINK),
+                             (self.get_hunger(), GREEN)):
+            blits.append((get_bar_sprite(size, int(value / 100 * size), color), (bar_x, bar_y)))
+            bar_y += STATUS_BAR_HEIGHT + 2
+        
+        # Badan (sprite yang sudah di-bake dan di-crop)
+        sprite, offset_x, offset_y = sprite_cache.get(self._sprite_key(), self._bake_sprite)
+        blits.append((sprite, (x + offset_x, y + offset_y)))
+        
+        blits.extend(self._label_blits(x, y))
+        return blits
+    
+    def draw(self, surface):
+        """Gambar hewan ke surface (satu Surface.blits, tanpa primitive per frame)"""
+        surface.blits(self.get_blits(), False)
 
 # ==================== POLYMORPHISM - Chicken ====================
 class Chicken(Animal):
     """
     Chicken class - inherit dari Animal (INHERITANCE).
-    Implementasi POLYMORPHISM lewat transform() yang berbeda.
+    Implementasi POLYMORPHISM lewat _draw_sprite() yang berbeda; bentuk
+    transform (Golden Chicken) cukup dari species.json tanpa override.
     """
+    __slots__ = ()
+    
     def __init__(self, x, y):
-        super().__init__("Ayam", x, y, WHITE, "chicken")
-        self._size = 50
-        self.__egg_count = 0  # Private counter
+        rules = self.species_def
+        super().__init__(rules.name, x, y, rules.base_color, rules.key)
+        self._size = rules.size
     
     def get_egg_count(self):
-        return self.__egg_count
-    
-    def transform(self):
-        """
-        POLYMORPHISM! Chicken transform jadi GOLDEN CHICKEN.
-        Override method dari parent dengan behavior berbeda.
-        """
-        self._current_color = GOLD
-        self._size = 60
-    
-    def reset_form(self):
-        """Reset ke bentuk normal"""
-        self._current_color = self._base_color
-        self._size = 50
-    
-    def produce(self):
-        """
-        POLYMORPHISM! Chicken produce telur.
-        Setiap animal produce berbeda.
-        """
-        if self.get_hunger() > 50 and self.get_energy() > 30:
-            if self.is_transformed():
-                self.__egg_count += 2  # Golden chicken produce lebih banyak!
-            else:
-                self.__egg_count += 1
+        return self.get_product_count()
     
     def collect_eggs(self):
         """Ambil telur dan reset counter"""
-        count = self.__egg_count
-        self.__egg_count = 0
-        return count
+        return self.collect_products()
     
-    def draw(self, surface):
+    def _draw_sprite(self, surface, x, y):
         """
         POLYMORPHISM! Setiap animal punya cara draw berbeda.
         Override abstract method dari parent.
         """
-        self.draw_base(surface)
-        
         # Body (bulat)
-        pygame.draw.circle(surface, self._current_color, 
-                          (int(self._x), int(self._y)), self._size//2)
+        pygame.draw.circle(surface, self._current_color, (x, y), self._size//2)
         
         # Head (bulat kecil)
-        head_x = int(self._x - self._size//4)
-        head_y = int(self._y - self._size//3)
+        head_x = x - self._size//4
+        head_y = y - self._size//3
         pygame.draw.circle(surface, self._current_color, 
                           (head_x, head_y), self._size//3)
         
@@ -359,16 +931,6 @@ class Chicken(Animal):
         else:
             crest_color = GOLD
         pygame.draw.circle(surface, crest_color, (head_x, head_y - 10), 5)
-        
-        # Telur icon kalau ada
-        if self.__egg_count > 0:
-            text = font_small.render(f"TELUR ×{self.__egg_count}", True, WHITE)
-            surface.blit(text, (self._x + 20, self._y - 30))
-        
-        # Transform indicator
-        if self.is_transformed():
-            star_text = font_small.render("[GOLD]", True, GOLD)
-            surface.blit(star_text, (self._x - 40, self._y - 50))
 
 
 # ==================== POLYMORPHISM - Cow ====================
@@ -376,57 +938,45 @@ class Cow(Animal):
     """
     Cow class - POLYMORPHISM dengan transformation berbeda dari Chicken.
     """
+    __slots__ = ("_spots_color",)
+    
     def __init__(self, x, y):
-        super().__init__("Sapi", x, y, (139, 90, 43), "cow")
-        self._size = 80
-        self.__milk_amount = 0  # Private
+        rules = self.species_def
+        super().__init__(rules.name, x, y, rules.base_color, rules.key)
+        self._size = rules.size
         self._spots_color = BLACK
     
     def get_milk_amount(self):
-        return self.__milk_amount
+        return self.get_product_count()
     
     def transform(self):
         """
         POLYMORPHISM! Cow transform jadi SUPER COW (Pink).
-        Implementation berbeda dari Chicken!
+        Selain warna & ukuran dari registry, totolnya jadi merah.
         """
-        self._current_color = PINK
+        super().transform()
         self._spots_color = RED
-        self._size = 95
     
     def reset_form(self):
         """Reset"""
-        self._current_color = self._base_color
+        super().reset_form()
         self._spots_color = BLACK
-        self._size = 80
-    
-    def produce(self):
-        """
-        POLYMORPHISM! Cow produce susu, bukan telur.
-        Implementation berbeda dari Chicken.produce()!
-        """
-        if self.get_hunger() > 50 and self.get_energy() > 30:
-            if self.is_transformed():
-                self.__milk_amount += 3  # Super cow produce lebih banyak!
-            else:
-                self.__milk_amount += 1
     
     def collect_milk(self):
         """Ambil susu"""
-        amount = self.__milk_amount
-        self.__milk_amount = 0
-        return amount
+        return self.collect_products()
     
-    def draw(self, surface):
+    def _sprite_key(self):
+        return super()._sprite_key() + (self._spots_color,)
+    
+    def _draw_sprite(self, surface, x, y):
         """
         POLYMORPHISM! Cow punya visual berbeda dari Chicken.
         """
-        self.draw_base(surface)
-        
         # Body (oval besar)
         body_rect = pygame.Rect(
-            int(self._x - self._size//2),
-            int(self._y - self._size//3),
+            x - self._size//2,
+            y - self._size//3,
             self._size,
             int(self._size * 0.7)
         )
@@ -434,16 +984,16 @@ class Cow(Animal):
         
         # Spots (totol-totol)
         spot_positions = [
-            (self._x - 15, self._y - 10),
-            (self._x + 10, self._y - 5),
-            (self._x - 5, self._y + 10)
+            (x - 15, y - 10),
+            (x + 10, y - 5),
+            (x - 5, y + 10)
         ]
         for pos in spot_positions:
             pygame.draw.circle(surface, self._spots_color, pos, 8)
         
         # Head
-        head_x = int(self._x - self._size//2 - 15)
-        head_y = int(self._y)
+        head_x = x - self._size//2 - 15
+        head_y = y
         pygame.draw.circle(surface, self._current_color, (head_x, head_y), 25)
         
         # Mata
@@ -468,16 +1018,6 @@ class Cow(Animal):
             (head_x + 20, head_y - 30),
             (head_x + 12, head_y - 18)
         ])
-        
-        # Milk icon
-        if self.__milk_amount > 0:
-            text = font_small.render(f"SUSU ×{self.__milk_amount}", True, WHITE)
-            surface.blit(text, (self._x + 30, self._y - 30))
-        
-        # Transform indicator
-        if self.is_transformed():
-            heart_text = font_small.render("[SUPER]", True, RED)
-            surface.blit(heart_text, (self._x - 50, self._y - 60))
 
 
 # ==================== POLYMORPHISM - Sheep ====================
@@ -485,281 +1025,2222 @@ class Sheep(Animal):
     """
     Sheep class - POLYMORPHISM lagi dengan transformation unik!
     """
+    __slots__ = ("_wool_color",)
+    
     def __init__(self, x, y):
-        super().__init__("Domba", x, y, WHITE, "sheep")
-        self._size = 70
-        self.__wool_amount = 0  # Private
+        rules = self.species_def
+        super().__init__(rules.name, x, y, rules.base_color, rules.key)
+        self._size = rules.size
         self._wool_color = WHITE
     
     def get_wool_amount(self):
-        return self.__wool_amount
+        return self.get_product_count()
     
     def transform(self):
         """
         POLYMORPHISM! Sheep transform jadi RAINBOW SHEEP.
-        Setiap animal transformasi BERBEDA!
+        Setiap animal transformasi BERBEDA - wol jadi warna acak!
         """
-        self._wool_color = (random.randint(100, 255), 
-                           random.randint(100, 255), 
-                           random.randint(100, 255))
-        self._size = 85
+        super().transform()
+        rng = self._rng
+        self._wool_color = (rng.randint(100, 255), 
+                           rng.randint(100, 255), 
+                           rng.randint(100, 255))
     
     def reset_form(self):
         """Reset"""
+        super().reset_form()
         self._wool_color = WHITE
-        self._size = 70
     
-    def produce(self):
-        """
-        POLYMORPHISM! Sheep produce wool.
-        Berbeda dari Chicken (telur) dan Cow (susu)!
-        """
-        if self.get_hunger() > 50 and self.get_energy() > 30:
-            if self.is_transformed():
-                self.__wool_amount += 2
-            else:
-                self.__wool_amount += 1
+    def _export_state(self):
+        state = super()._export_state()
+        state["wool_color"] = self._wool_color
+        return state
+    
+    def _snapshot_row(self):
+        return super()._snapshot_row() + tuple(self._wool_color)
+    
+    def _import_state(self, state):
+        super()._import_state(state)  # transform() di sini mengacak warna...
+        self._wool_color = tuple(state["wool_color"])  # ...jadi timpa dengan yang tersimpan
     
     def collect_wool(self):
         """Ambil wool"""
-        amount = self.__wool_amount
-        self.__wool_amount = 0
-        return amount
+        return self.collect_products()
     
-    def draw(self, surface):
+    def _sprite_key(self):
+        return super()._sprite_key() + (self._wool_color,)
+    
+    def _silhouette_color(self):
+        return self._wool_color
+    
+    def _draw_sprite(self, surface, x, y):
         """
         POLYMORPHISM! Sheep visual berbeda dari Chicken dan Cow.
         """
-        self.draw_base(surface)
-        
         # Body (fluffy circles untuk wool effect)
         circles = [
-            (self._x, self._y, self._size//2),
-            (self._x - 20, self._y - 5, self._size//3),
-            (self._x + 20, self._y - 5, self._size//3),
-            (self._x, self._y + 15, self._size//3)
+            (x, y, self._size//2),
+            (x - 20, y - 5, self._size//3),
+            (x + 20, y - 5, self._size//3),
+            (x, y + 15, self._size//3)
         ]
         for cx, cy, radius in circles:
-            pygame.draw.circle(surface, self._wool_color, (int(cx), int(cy)), radius)
+            pygame.draw.circle(surface, self._wool_color, (cx, cy), radius)
         
         # Head (hitam)
-        head_x = int(self._x - self._size//2 - 10)
-        head_y = int(self._y - 5)
+        head_x = x - self._size//2 - 10
+        head_y = y - 5
         pygame.draw.circle(surface, BLACK, (head_x, head_y), 20)
         
         # Mata
         eye_size = 4
         pygame.draw.circle(surface, WHITE, (head_x - 6, head_y - 3), eye_size)
         pygame.draw.circle(surface, WHITE, (head_x + 6, head_y - 3), eye_size)
-        
-        # Wool icon
-        if self.__wool_amount > 0:
-            text = font_small.render(f"WOOL ×{self.__wool_amount}", True, WHITE)
-            surface.blit(text, (self._x + 25, self._y - 30))
-        
-        # Transform indicator
-        if self.is_transformed():
-            rainbow_text = font_small.render("RAINBOW", True, WHITE)
-            surface.blit(rainbow_text, (self._x - 45, self._y - 55))
 
+# ==================== SPECIES REGISTRY ====================
+SPECIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "species.json")
 
-# ==================== GAME MANAGER ====================
-class Farm:
-    """Main game class dengan composition"""
-    def __init__(self):
-        self.animals = []
-        self.selected_animal = None
-        self.money = 500  # Lebih banyak uang awal!
-        self.total_eggs = 0
-        self.total_milk = 0
-        self.total_wool = 0
-        self.day = 1
-        self.time_of_day = 0  # 0-1000 (morning to night)
-        self.missions = self._create_missions()
-        self.tutorial_step = 0
-        self.show_tutorial = True
-        
-        # Spawn initial animals - lebih rapi
-        self.animals.append(Chicken(250, 400))
-        self.animals.append(Cow(500, 400))
-        self.animals.append(Sheep(750, 400))
-        
-        # UI state
-        self.show_shop = False
-        self.messages = []
-        
-    def _create_missions(self):
-        """Create mission list"""
-        return [
-            {"text": "Kumpulkan 3 telur!", "type": "eggs", "target": 3, "reward": 100, "completed": False},
-            {"text": "Kumpulkan 2 susu!", "type": "milk", "target": 2, "reward": 80, "completed": False},
-            {"text": "Transform 1 hewan!", "type": "transform", "target": 1, "reward": 150, "completed": False},
-            {"text": "Kumpulkan 2 wol!", "type": "wool", "target": 2, "reward": 80, "completed": False},
-            {"text": "Beli 1 hewan!", "type": "buy", "target": 1, "reward": 50, "completed": False},
-        ]
+# Recipe = class yang punya kode gambar (_draw_sprite) dan efek transform khusus
+SPECIES_RECIPES = {cls.__name__: cls for cls in (Chicken, Cow, Sheep)}
+
+
+class SpeciesDef:
+    """
+    Definisi satu species dari species.json: nama, harga toko, produk,
+    aturan transform dan parameter render. Dipasang sebagai class attribute
+    species_def, jadi dispatch per hewan cukup satu attribute lookup.
+    """
+    __slots__ = ("key", "cls", "name", "code", "shop_price", "size", "base_color",
+                 "product_key", "product_name", "product_label", "product_price",
+                 "product_color", "yields", "min_happiness", "min_hunger",
+                 "transform_size", "transform_color", "transform_name", "badge", "badge_color",
+                 "transform_message", "transform_message_color", "label_offset",
+                 "badge_offset")
     
-    def add_message(self, text, color=YELLOW):
-        """Tambah notifikasi message"""
-        self.messages.append({"text": text, "color": color, "timer": 180})
+    def __init__(self, entry):
+        product = entry["product"]
+        rules = entry["transform"]
+        render = entry.get("render", {})
+        self.key = entry["key"]
+        self.cls = None
+        self.name = entry["name"]
+        self.code = entry["code"]  # Species code di file save (1-255)
+        self.shop_price = entry.get("shop_price")  # None = tidak dijual
+        self.size = entry["size"]
+        self.base_color = tuple(entry["base_color"])
+        self.product_key = product["key"]  # Juga nama counter misi
+        self.product_name = product["name"]
+        self.product_label = product["label"]
+        self.product_price = product["price"]
+        self.product_color = tuple(product["color"])
+        # Index pakai is_transformed(): yields[False] normal, yields[True] transform
+        self.yields = (entry["yield"]["normal"], entry["yield"]["transformed"])
+        self.min_happiness = rules["min_happiness"]
+        self.min_hunger = rules["min_hunger"]
+        self.transform_size = rules["size"]
+        self.transform_color = tuple(rules["color"]) if rules.get("color") else None
+        self.transform_name = rules.get("name", f"{self.name} {rules['badge']}")  # Tutorial
+        self.badge = rules["badge"]
+        self.badge_color = tuple(rules["badge_color"])
+        self.transform_message = rules["message"]
+        self.transform_message_color = tuple(rules["message_color"])
+        self.label_offset = tuple(render.get("label_offset", (20, -30)))
+        self.badge_offset = tuple(render.get("badge_offset", (-40, -50)))
+
+
+def load_species(path=SPECIES_PATH):
+    """
+    Baca registry species dari JSON -> dict key -> SpeciesDef (urut file).
+    Species pertama yang memakai sebuah recipe mendapat class itu sendiri;
+    species berikutnya dengan recipe yang sama dapat subclass baru.
+    """
+    with open(path) as f:
+        entries = json.load(f)["species"]
+    registry = {}
+    claimed = set()
+    for entry in entries:
+        definition = SpeciesDef(entry)
+        recipe = SPECIES_RECIPES[entry["recipe"]]
+        if recipe in claimed:
+            cls = type(definition.key.title().replace("_", ""), (recipe,), {"__slots__": ()})
+        else:
+            cls = recipe
+            claimed.add(recipe)
+        cls.species_def = definition
+        definition.cls = cls
+        registry[definition.key] = definition
+    return registry
+
+
+SPECIES = load_species()
+SHOP_SPECIES = [definition for definition in SPECIES.values()
+                if definition.shop_price is not None]
+# Product key -> species pertama yang menghasilkannya (nama & warna produk di UI)
+PRODUCT_SPECIES = {}
+for definition in SPECIES.values():
+    PRODUCT_SPECIES.setdefault(definition.product_key, definition)
+PRODUCT_KEYS = tuple(PRODUCT_SPECIES)
+
+# ==================== HERD STORE (VECTORIZED) ====================
+class HerdStore:
+    """
+    Structure-of-arrays untuk state simulasi seluruh herd (butuh NumPy).
     
-    def handle_events(self):
-        """Handle user input"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False
-            
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Left click
-                    self._handle_click(event.pos)
-            
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    self.show_tutorial = False
-                elif event.key == pygame.K_s:
-                    self.show_shop = not self.show_shop
-                elif event.key == pygame.K_f:
-                    self._feed_selected()
-                elif event.key == pygame.K_p:
-                    self._pet_selected()
-                elif event.key == pygame.K_c:
-                    self._collect_products()
-        return True
+    Hewan yang di-bind jadi THIN VIEW: getter/setter-nya (get_hunger, feed,
+    pet, dll) membaca/menulis array di sini, dan step() menjalankan logic
+    Animal.update + _check_transformation untuk semua hewan dalam satu pass.
+    Posisi disalin balik ke _x/_y tiap step supaya kode draw tetap sama.
+    """
+    FLOAT_FIELDS = ("x", "y", "target_x", "target_y", "hunger", "energy",
+                    "happiness", "last_interaction")
+    INT_FIELDS = ("movement_timer", "product_timer")
+    # Aturan transform per slot (dari species_def) - bukan state, tidak ikut export
+    RULE_FIELDS = ("min_happiness", "min_hunger")
     
-    def _handle_click(self, pos):
-        """Handle mouse click"""
-        # Check shop buttons
-        if self.show_shop:
-            self._check_shop_click(pos)
-            return
-        
-        # Check animal selection
-        for animal in self.animals:
-            if animal.check_click(pos):
-                if self.selected_animal:
-                    self.selected_animal.deselect()
-                self.selected_animal = animal
-                animal.select()
-                self.add_message(f"Dipilih: {animal.get_name()}")
-                return
-        
-        # Deselect if click empty space
-        if self.selected_animal:
-            self.selected_animal.deselect()
-            self.selected_animal = None
+    def __init__(self, capacity=64):
+        if np is None:
+            raise RuntimeError("HerdStore butuh NumPy (pip install numpy)")
+        self._animals = []
+        self._capacity = max(1, capacity)
+        for field in self.FLOAT_FIELDS:
+            setattr(self, field, np.zeros(self._capacity, dtype=np.float64))
+        for field in self.INT_FIELDS:
+            setattr(self, field, np.zeros(self._capacity, dtype=np.int64))
+        for field in self.RULE_FIELDS:
+            setattr(self, field, np.zeros(self._capacity, dtype=np.float64))
+        self.transformed = np.zeros(self._capacity, dtype=bool)
     
-    def _feed_selected(self):
-        """Feed selected animal - LEBIH MURAH!"""
-        if self.selected_animal and self.money >= 5:  # Dari $10 jadi $5
-            self.selected_animal.feed(40)  # Lebih kenyang
-            self.money -= 5
-            self.add_message("Dikasih makan!", GREEN)
-        elif self.money < 5:
-            self.add_message("Uang tidak cukup!", RED)
+    def __len__(self):
+        return len(self._animals)
     
-    def _pet_selected(self):
-        """Pet selected animal"""
-        if self.selected_animal:
-            self.selected_animal.pet()
-            self.add_message("Dielus-elus!", PINK)
+    def _grow(self):
+        """Double kapasitas array (amortized O(1) per bind)"""
+        self._capacity *= 2
+        for field in self.FLOAT_FIELDS + self.INT_FIELDS + self.RULE_FIELDS + ("transformed",):
+            old = getattr(self, field)
+            new = np.zeros(self._capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, field, new)
     
-    def _collect_products(self):
-        """Collect products from selected animal - HARGA LEBIH TINGGI!"""
-        if not self.selected_animal:
-            return
-        
-        animal = self.selected_animal
-        collected = False
-        
-        if isinstance(animal, Chicken):
-            eggs = animal.collect_eggs()
-            if eggs > 0:
-                self.total_eggs += eggs
-                self.money += eggs * 15  # Dari $5 jadi $15!
-                self.add_message(f"Dapat {eggs} telur! +${eggs*15}", YELLOW)
-                collected = True
-        
-        elif isinstance(animal, Cow):
-            milk = animal.collect_milk()
-            if milk > 0:
-                self.total_milk += milk
-                self.money += milk * 25  # Dari $10 jadi $25!
-                self.add_message(f"Dapat {milk} susu! +${milk*25}", BLUE)
-                collected = True
-        
-        elif isinstance(animal, Sheep):
-            wool = animal.collect_wool()
-            if wool > 0:
-                self.total_wool += wool
-                self.money += wool * 20  # Dari $8 jadi $20!
-                self.add_message(f"Dapat {wool} wol! +${wool*20}", WHITE)
-                collected = True
-        
-        if collected:
-            self._check_missions()
+    def bind(self, animal):
+        """Pindahkan state animal ke array dan jadikan animal thin view"""
+        if animal._herd is not None:
+            raise ValueError(f"{animal.get_name()} sudah terikat ke herd")
+        if len(self._animals) == self._capacity:
+            self._grow()
+        
+        slot = len(self._animals)
+        state = animal._export_state()
+        for field in self.FLOAT_FIELDS + self.INT_FIELDS + ("transformed",):
+            getattr(self, field)[slot] = state[field]
+        for field in self.RULE_FIELDS:
+            getattr(self, field)[slot] = getattr(animal.species_def, field)
+        self._animals.append(animal)
+        animal._herd = self
+        animal._slot = slot
     
-    def _check_shop_click(self, pos):
-        """Check shop button clicks"""
-        button_rects = [
-            pygame.Rect(WIDTH - 250, 120, 230, 50),  # Buy Chicken
-            pygame.Rect(WIDTH - 250, 180, 230, 50),  # Buy Cow
-            pygame.Rect(WIDTH - 250, 240, 230, 50),  # Buy Sheep
-        ]
+    def slot_state(self, slot):
+        """Nilai array untuk satu slot sebagai dict (Python float/int/bool)"""
+        state = {field: float(getattr(self, field)[slot]) for field in self.FLOAT_FIELDS}
+        state.update((field, int(getattr(self, field)[slot])) for field in self.INT_FIELDS)
+        state["transformed"] = bool(self.transformed[slot])
+        return state
+    
+    def feed(self, slots, food_value):
+        """Animal.feed untuk banyak slot sekaligus (bulk action)"""
+        slots = np.asarray(slots, dtype=np.intp)
+        self.hunger[slots] = np.minimum(100, self.hunger[slots] + food_value)
+        self.happiness[slots] = np.clip(self.happiness[slots] + 10, 0, 100)
+        self.energy[slots] = np.minimum(100, self.energy[slots] + 20)
+        self._check_transformations(slots)
+    
+    def pet(self, slots):
+        """Animal.pet untuk banyak slot sekaligus"""
+        slots = np.asarray(slots, dtype=np.intp)
+        self.happiness[slots] = np.clip(self.happiness[slots] + 15, 0, 100)
+        self.energy[slots] = np.minimum(100, self.energy[slots] + 5)
+    
+    def _check_transformations(self, slots):
+        """Animal._check_transformation untuk slots tertentu"""
+        should_transform = ((self.happiness[slots] > self.min_happiness[slots])
+                            & (self.hunger[slots] > self.min_hunger[slots]))
+        changed = should_transform != self.transformed[slots]
+        self.transformed[slots] = should_transform
+        for i, transformed in zip(slots[changed].tolist(), should_transform[changed].tolist()):
+            self._animals[i]._apply_form(transformed)
+    
+    def gather(self, field, slots, typecode):
+        """Copy kolom field untuk slots sebagai array.array (untuk snapshot)"""
+        values = getattr(self, field)[slots].astype(np.dtype(typecode))
+        return array(typecode, values.tobytes())
+    
+    def release(self):
+        """Tulis balik state ke semua animal dan lepas binding"""
+        for animal in self._animals:
+            state = animal._export_state()
+            animal._herd = None
+            animal._slot = -1
+            animal._import_state(state)
+        self._animals = []
+    
+    def step(self, now=None, visible=None, phase=0):
+        """
+        Satu tick simulasi untuk seluruh herd.
+        Urutan sama dengan FarmEntity.update -> Animal.update -> _check_transformation.
+        visible = set hewan di sekitar kamera (None = semua). Simulasi array tetap
+        untuk semua hewan; yang di luar kamera hanya disalin ke object/grid
+        bergiliran (index % OFFSCREEN_TICKS == phase).
+        """
+        n = len(self._animals)
+        if n == 0:
+            return
+        if now is None:
+            now = pygame.time.get_ticks()
+        
+        x, y = self.x[:n], self.y[:n]
+        target_x, target_y = self.target_x[:n], self.target_y[:n]
+        hunger, energy = self.hunger[:n], self.energy[:n]
+        happiness = self.happiness[:n]
+        
+        # FarmEntity.update - happiness turun kalau lama tidak diinteraksi
+        idle = (now - self.last_interaction[:n]) > 15000
+        happiness[idle] = np.clip(happiness[idle] - 0.5, 0, 100)
         
-        prices = [50, 100, 80]
-        animals_to_add = [Chicken, Cow, Sheep]
-        names = ["Ayam", "Sapi", "Domba"]
-        
-        for i, rect in enumerate(button_rects):
-            if rect.collidepoint(pos):
-                if self.money >= prices[i]:
-                    x = random.randint(200, WIDTH - 200)
-                    y = random.randint(300, HEIGHT - 200)
-                    new_animal = animals_to_add[i](x, y)
-                    self.animals.append(new_animal)
-                    self.money -= prices[i]
-                    self.add_message(f"Beli {names[i]}! -${prices[i]}", GREEN)
-                    self._check_missions()
+        # Hunger & energy berkurang over time
+        np.maximum(hunger - 0.05, 0, out=hunger)
+        np.maximum(energy - 0.02, 0, out=energy)
+        
+        # Happiness turun kalau lapar
+        starving = hunger < 30
+        happiness[starving] = np.clip(happiness[starving] - 0.2, 0, 100)
+        
+        # Random movement - hanya hewan yang timer-nya habis
+        movement_timer = self.movement_timer[:n]
+        movement_timer -= 1
+        for i in np.flatnonzero(movement_timer <= 0).tolist():
+            animal = self._animals[i]
+            rng = animal._rng
+            x0, x1, y0, y1 = animal._pasture
+            target_x[i] = rng.randint(x0, x1)
+            target_y[i] = rng.randint(y0, y1)
+            movement_timer[i] = rng.randint(180, 400)
+        
+        # Move towards target (speed 1.0)
+        dx = target_x - x
+        dy = target_y - y
+        distance = np.sqrt(dx * dx + dy * dy)
+        moving = distance > 2
+        x[moving] += dx[moving] / distance[moving]
+        y[moving] += dy[moving] / distance[moving]
+        
+        # Production timer - produce() dipanggil hanya untuk yang jatuh tempo
+        product_timer = self.product_timer[:n]
+        product_timer += 1
+        due = np.flatnonzero(product_timer >= PRODUCT_TICKS)
+        for i in due.tolist():
+            self._animals[i].produce()
+        product_timer[due] = 0
+        
+        # Transformation - transform()/reset_form() hanya untuk yang berubah
+        should_transform = (happiness > self.min_happiness[:n]) & (hunger > self.min_hunger[:n])
+        changed = np.flatnonzero(should_transform != self.transformed[:n])
+        self.transformed[:n] = should_transform
+        for i in changed.tolist():
+            self._animals[i]._apply_form(bool(should_transform[i]))
+        
+        # Salin posisi balik ke object untuk draw/check_click
+        if visible is None:
+            slots = range(n)
+        else:
+            slots = set(range(phase, n, OFFSCREEN_TICKS))
+            slots.update(animal._slot for animal in visible)
+            slots = sorted(slots)
+        animals, xs, ys = self._animals, x.tolist(), y.tolist()
+        for i in slots:
+            animal = animals[i]
+            animal._prev_x = animal._x
+            animal._prev_y = animal._y
+            animal._x = xs[i]
+            animal._y = ys[i]
+            if animal._grid is not None:
+                animal._grid.update(animal)
+
+
+# ==================== SPATIAL GRID ====================
+class SpatialGrid:
+    """
+    Uniform grid (spatial hash) untuk query posisi entity.
+    Setiap entity disimpan di cell berdasarkan posisi tengahnya dan dipindah
+    incremental lewat update() setiap kali bergerak, jadi klik, seleksi kotak
+    dan query tetangga hanya memeriksa beberapa cell, bukan seluruh list.
+    """
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self._cells = {}  # (cx, cy) -> set entity
+        self._order = {}  # entity -> urutan insert (untuk pick yang stabil)
+        self._next_order = 0
+        self._max_extent = 0  # Setengah ukuran entity terbesar yang pernah ada
+    
+    def __len__(self):
+        return len(self._order)
+    
+    def _key(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+    
+    def _cells_in(self, left, top, right, bottom):
+        """Semua entity di cell yang overlap dengan kotak (left, top, right, bottom)"""
+        cx0, cy0 = self._key(left, top)
+        cx1, cy1 = self._key(right, bottom)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self._cells.get((cx, cy))
+                if bucket:
+                    yield from bucket
+    
+    def insert(self, entity):
+        key = self._key(entity._x, entity._y)
+        self._cells.setdefault(key, set()).add(entity)
+        self._order[entity] = self._next_order
+        self._next_order += 1
+        self._max_extent = max(self._max_extent, entity._size / 2)
+        entity._grid = self
+        entity._cell = key
+    
+    def remove(self, entity):
+        bucket = self._cells.get(entity._cell)
+        if bucket is not None:
+            bucket.discard(entity)
+            if not bucket:
+                del self._cells[entity._cell]
+        del self._order[entity]
+        entity._grid = None
+        entity._cell = None
+    
+    def update(self, entity):
+        """Pindah cell kalau entity melewati batas cell (O(1))"""
+        if entity._size / 2 > self._max_extent:
+            self._max_extent = entity._size / 2
+        key = self._key(entity._x, entity._y)
+        if key == entity._cell:
+            return
+        bucket = self._cells[entity._cell]
+        bucket.discard(entity)
+        if not bucket:
+            del self._cells[entity._cell]
+        self._cells.setdefault(key, set()).add(entity)
+        entity._cell = key
+    
+    def pick(self, pos):
+        """
+        Entity yang kena klik di pos (pakai check_click), atau None.
+        Kalau beberapa overlap, yang paling dulu di-insert menang (sama
+        seperti loop lama atas self.animals).
+        """
+        r = self._max_extent
+        px, py = pos
+        hits = [e for e in self._cells_in(px - r, py - r, px + r, py + r)
+                if e.check_click(pos)]
+        if not hits:
+            return None
+        return min(hits, key=self._order.__getitem__)
+    
+    def query_rect(self, rect):
+        """Entity yang titik tengahnya ada di dalam rect (drag-box selection)"""
+        rect = pygame.Rect(rect)
+        found = [e for e in self._cells_in(rect.left, rect.top, rect.right, rect.bottom)
+                 if rect.collidepoint(e._x, e._y)]
+        found.sort(key=self._order.__getitem__)
+        return found
+    
+    def visible(self, rect, margin=0):
+        """
+        Set entity yang mungkin terlihat di rect (view culling): titik tengahnya
+        di dalam rect yang diperbesar setengah ukuran entity terbesar + margin.
+        Cell yang seluruhnya di dalam diterima tanpa cek per entity.
+        """
+        pad = self._max_extent + margin
+        left, top = rect.left - pad, rect.top - pad
+        right, bottom = rect.right + pad, rect.bottom + pad
+        cx0, cy0 = self._key(left, top)
+        cx1, cy1 = self._key(right, bottom)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self._cells):
+            keys = [key for key in self._cells if cx0 <= key[0] <= cx1 and cy0 <= key[1] <= cy1]
+        else:
+            keys = [(cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)]
+        size = self.cell_size
+        found = set()
+        for cx, cy in keys:
+            bucket = self._cells.get((cx, cy))
+            if not bucket:
+                continue
+            if (cx * size >= left and (cx + 1) * size <= right
+                    and cy * size >= top and (cy + 1) * size <= bottom):
+                found.update(bucket)
+            else:
+                found.update(e for e in bucket if left <= e._x <= right and top <= e._y <= bottom)
+        return found
+    
+    def neighbors(self, pos, radius):
+        """Entity dengan jarak tengah <= radius dari pos"""
+        px, py = pos
+        r2 = radius * radius
+        return [e for e in self._cells_in(px - radius, py - radius, px + radius, py + radius)
+                if (e._x - px) ** 2 + (e._y - py) ** 2 <= r2]
+    
+    def nearest(self, pos, k=1, exclude=None):
+        """
+        k entity terdekat dari pos, urut dari yang paling dekat.
+        Cari ring demi ring dari cell pos, berhenti begitu ring berikutnya
+        pasti lebih jauh dari kandidat ke-k.
+        """
+        if k <= 0 or not self._order:
+            return []
+        px, py = pos
+        cx, cy = self._key(px, py)
+        found = []
+        ring = 0
+        # Ring maksimal = ukuran area grid dalam cell
+        keys = self._cells.keys()
+        max_ring = max(max(abs(kx - cx), abs(ky - cy)) for kx, ky in keys)
+        while ring <= max_ring:
+            for kx in range(cx - ring, cx + ring + 1):
+                for ky in range(cy - ring, cy + ring + 1):
+                    if max(abs(kx - cx), abs(ky - cy)) != ring:
+                        continue  # Hanya pinggiran ring
+                    for e in self._cells.get((kx, ky), ()):
+                        if e is not exclude:
+                            found.append(((e._x - px) ** 2 + (e._y - py) ** 2, e))
+            if len(found) >= k:
+                # Entity di ring berikutnya paling dekat berjarak ring * cell_size
+                found.sort(key=lambda item: item[0])
+                limit = ring * self.cell_size
+                if found[k - 1][0] <= limit * limit:
+                    break
+            ring += 1
+        found.sort(key=lambda item: item[0])
+        return [e for _, e in found[:k]]
+
+
+# ==================== CULLING & LEVEL OF DETAIL ====================
+_cull_margin = None  # Dihitung sekali oleh cull_margin()
+LOD_CROWD_THRESHOLD = 400  # Hewan terlihat di atas ini -> siluet
+LOD_ZOOM_THRESHOLD = 1.0   # Zoom kamera di bawah ini -> siluet (sprite detail hanya ukuran asli)
+LOD_HYSTERESIS = 0.1  # Kembali ke detail penuh baru di bawah threshold * 0.9
+
+
+def cull_margin():
+    """
+    Seberapa jauh gambar hewan keluar dari setengah ukuran badannya (pixel),
+    diukur sekali dari gambar sebenarnya tiap species di registry dalam kedua
+    form: sprite badan yang sudah di-crop, shadow, ring, status bar, label
+    produk dan badge. Ditambahkan ke SpatialGrid._max_extent saat culling.
+    """
+    global _cull_margin
+    if _cull_margin is None:
+        margin = 0
+        for definition in SPECIES.values():
+            probe = definition.cls(0, 0)
+            probe._rng = random.Random(0)  # Sheep.transform tidak mengacak RNG global
+            probe.select()
+            for transformed in (False, True):
+                probe._set_transformed(transformed)
+                probe._apply_form(transformed)
+                rects = [pygame.Rect(pos, surf.get_size()) for surf, pos in probe.get_blits()]
+                label = render_text(font_small, f"{definition.product_label} ×9999", WHITE)
+                badge = render_text(font_small, definition.badge, definition.badge_color)
+                rects.append(pygame.Rect(definition.label_offset, label.get_size()))
+                rects.append(pygame.Rect(definition.badge_offset, badge.get_size()))
+                bounds = rects[0].unionall(rects[1:])
+                extent = max(-bounds.left, bounds.right, -bounds.top, bounds.bottom)
+                margin = max(margin, math.ceil(extent - probe._size / 2))
+        _cull_margin = margin
+    return _cull_margin
+
+
+class LodPolicy:
+    """
+    Pilih level detail untuk satu frame dari jumlah hewan terlihat dan zoom.
+    Pakai hysteresis supaya tidak bolak-balik setiap frame saat jumlah hewan
+    di sekitar threshold (ganti level = semua hewan digambar ulang).
+    """
+    __slots__ = ("crowd_threshold", "zoom_threshold", "hysteresis", "current")
+    
+    def __init__(self, crowd_threshold=LOD_CROWD_THRESHOLD, zoom_threshold=LOD_ZOOM_THRESHOLD,
+                 hysteresis=LOD_HYSTERESIS):
+        self.crowd_threshold = crowd_threshold  # None = tidak pernah siluet karena ramai
+        self.zoom_threshold = zoom_threshold
+        self.hysteresis = hysteresis
+        self.current = LOD_FULL
+    
+    def level(self, visible_count, zoom=1.0):
+        scale = 1 - self.hysteresis if self.current == LOD_SIMPLE else 1
+        crowded = (self.crowd_threshold is not None
+                   and visible_count > self.crowd_threshold * scale)
+        far = zoom < self.zoom_threshold  # Zoom diubah pemain, tidak perlu hysteresis
+        self.current = LOD_SIMPLE if crowded or far else LOD_FULL
+        return self.current
+
+
+# ==================== BACKGROUND ====================
+SKY_STEPS = 128  # Kuantisasi time_of_day (0-1000) untuk LUT warna langit
+GROUND_HEIGHT = 150
+GRASS_OVERHANG = 2  # Garis rumput tebal 2 px bisa keluar sedikit di atas tanah
+
+
+def sky_color_at(time_of_day):
+    """Sky gradient (day/night cycle) - dipakai untuk mengisi LUT Background"""
+    time_ratio = time_of_day / 1000
+    if time_ratio < 0.5:  # Morning to afternoon
+        return (135, 206, 250)  # Light blue
+    # Evening to night
+    night_progress = (time_ratio - 0.5) * 2
+    return (
+        int(135 - 105 * night_progress),
+        int(206 - 176 * night_progress),
+        int(250 - 180 * night_progress)
+    )
+
+
+class Background:
+    """
+    Langit, tanah dan rumput yang di-bake, bukan digambar tiap frame.
+    Layer tanah + rumput di-render sekali; warna langit diambil dari LUT per
+    time_of_day yang dikuantisasi; Surface background lengkap disimpan per
+    warna langit (LRU kecil), jadi per frame cukup satu blit.
+    Semua dibangun ulang hanya kalau ukuran layar berubah (objek baru).
+    """
+    def __init__(self, size, steps=SKY_STEPS, cached=4):
+        self.size = tuple(size)
+        self.steps = steps
+        self.sky_lut = [sky_color_at(i * 1000 / steps) for i in range(steps + 1)]
+        self.cached = cached
+        self.builds = 0  # Berapa kali Surface background lengkap dibuat
+        self._ground, self._ground_top = self._bake_ground()
+        self._surfaces = OrderedDict()  # warna langit -> Surface
+    
+    def sky_color(self, time_of_day):
+        index = int(time_of_day * self.steps / 1000)
+        return self.sky_lut[min(self.steps, max(0, index))]
+    
+    def _bake_ground(self):
+        """Layer tanah + rumput (transparan di atas tanah) untuk di-blit di atas langit"""
+        width, height = self.size
+        top = height - GROUND_HEIGHT - GRASS_OVERHANG
+        layer = pygame.Surface((width, height - top), pygame.SRCALPHA)
+        
+        # Ground
+        ground_y = GRASS_OVERHANG
+        pygame.draw.rect(layer, GRASS_GREEN, pygame.Rect(0, ground_y, width, GROUND_HEIGHT))
+        
+        # Grass details
+        for i in range(0, width, 30):
+            pygame.draw.line(layer, DARK_GREEN, (i, ground_y), (i + 10, ground_y + 10), 2)
+        return _convert_alpha(layer), top
+    
+    def get(self, sky_color):
+        """Surface background lengkap (langit + tanah) untuk sky_color"""
+        surface = self._surfaces.get(sky_color)
+        if surface is not None:
+            self._surfaces.move_to_end(sky_color)
+            return surface
+        if len(self._surfaces) >= self.cached:
+            _, surface = self._surfaces.popitem(last=False)  # Pakai ulang, tanpa alokasi
+        else:
+            surface = pygame.Surface(self.size)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+        surface.fill(sky_color)
+        surface.blit(self._ground, (0, self._ground_top))
+        self._surfaces[sky_color] = surface
+        self.builds += 1
+        return surface
+
+
+# ==================== DIRTY-RECT RENDERER ====================
+class DirtyRenderer:
+    """
+    Renderer yang hanya menggambar ulang bagian layar yang berubah.
+    
+    Background (langit, tanah, rumput) diambil dari Background. Setiap
+    frame, blit list hewan, panel UI dan notifikasi dibandingkan dengan frame
+    sebelumnya; area yang berubah di-restore dari background, layer di atasnya
+    digambar ulang dengan clip, lalu hanya area itu dikirim lewat
+    present(rects) (lewat Viewport). Full redraw hanya saat langit berubah warna,
+    tutorial dibuka/ditutup, atau area kotor terlalu besar.
+    """
+    def __init__(self, max_dirty_ratio=0.5, max_rects=64, lod=None):
+        self.max_dirty_ratio = max_dirty_ratio  # Di atas ini lebih murah full redraw
+        self.max_rects = max_rects
+        self.lod = lod if lod is not None else LodPolicy()
+        self.background = None  # Background untuk ukuran layar sekarang
+        self._background = None
+        self._sky_color = None
+        self._show_tutorial = None
+        self._animal_state = {}  # animal -> (blits, bounds), hanya yang terlihat
+        self._visible = []  # Hewan yang lolos culling, urut seperti farm.animals
+        self._ui_state = {}  # nama panel -> (rect, signature)
+        self._message_state = ((), [])  # (signature, rects)
+        self._full_redraw = True
+        self.full_redraws = 0
+        self.partial_redraws = 0
+        self.skipped_frames = 0
+        self.last_update_rects = []
+        self.last_draw_calls = 0  # Blit hewan + pass overlay di frame terakhir
+        self.last_visible = 0
+        self.last_culled = 0  # Hewan di luar layar, tidak dibuat blit-nya
+        self.last_simplified = 0  # Hewan yang digambar sebagai siluet
+    
+    def invalidate(self):
+        """Paksa full redraw di frame berikutnya (misal window di-expose)"""
+        self._full_redraw = True
+    
+    @staticmethod
+    def _blit_bounds(blits):
+        rects = [pygame.Rect(pos, surf.get_size()) for surf, pos in blits]
+        return rects[0].unionall(rects[1:]) if rects else pygame.Rect(0, 0, 0, 0)
+    
+    @staticmethod
+    def _merge_rects(rects):
+        """
+        Gabung rect yang overlap kalau union-nya tidak lebih luas dari jumlah
+        keduanya (posisi lama + baru hewan yang sama, hewan yang berdempetan).
+        Rect yang hanya bersinggungan sedikit dibiarkan terpisah - irisannya
+        digambar dua kali, tapi tidak jadi satu kotak besar selebar herd.
+        """
+        merged = []
+        for rect in rects:
+            rect = rect.copy()
+            index = 0
+            while index < len(merged):
+                other = merged[index]
+                union = rect.union(other)
+                if (rect.colliderect(other)
+                        and union.w * union.h <= rect.w * rect.h + other.w * other.h):
+                    rect = union
+                    merged.pop(index)
+                    index = 0  # Rect membesar - cek ulang dari awal
                 else:
-                    self.add_message("Uang tidak cukup!", RED)
+                    index += 1
+            merged.append(rect)
+        return merged
     
-    def _check_missions(self):
-        """Check if any mission completed"""
-        for mission in self.missions:
-            if mission["completed"]:
+    @staticmethod
+    def _visible_animals(farm):
+        """Hewan yang mungkin terlihat (query SpatialGrid), urutan draw tetap"""
+        candidates = farm.grid.visible(farm.view_rect(), cull_margin())
+        if len(candidates) == len(farm.animals):
+            return farm.animals
+        return [animal for animal in farm.animals if animal in candidates]
+    
+    def _collect_dirty(self, farm):
+        """Bandingkan state frame ini dengan frame lalu, return list rect kotor"""
+        dirty = []
+        
+        # Culling + LOD: blit hanya dibuat untuk hewan yang terlihat
+        visible = self._visible_animals(farm)
+        zoom = farm.view_zoom()
+        detail = self.lod.level(len(visible), zoom)
+        view = farm.camera.transform()
+        self._visible = visible
+        self.last_visible = len(visible)
+        self.last_culled = len(farm.animals) - len(visible)
+        
+        # Hewan - blit list sama persis (surface cache + posisi) berarti tidak berubah
+        animal_state = {}
+        profiler = farm.profiler
+        alpha = farm.render_alpha
+        for animal in visible:
+            if profiler.enabled:
+                start = time.perf_counter()
+                blits = animal.get_blits(alpha, detail, view)
+                profiler.add(f"draw.{animal.get_species()}", (time.perf_counter() - start) * 1000)
+            else:
+                blits = animal.get_blits(alpha, detail, view)
+            old = self._animal_state.get(animal)
+            if old is not None and old[0] == blits:
+                animal_state[animal] = old
                 continue
-            
-            if mission["type"] == "eggs" and self.total_eggs >= mission["target"]:
+            bounds = self._blit_bounds(blits)
+            animal_state[animal] = (blits, bounds)
+            dirty.append(bounds)
+            if old is not None:
+                dirty.append(old[1])
+        for animal, (_, bounds) in self._animal_state.items():
+            if animal not in animal_state:
+                dirty.append(bounds)  # Hewan yang hilang / keluar layar
+        self._animal_state = animal_state
+        self.last_simplified = 0
+        if zoom != 1.0:
+            self.last_simplified = len(visible)
+        elif detail == LOD_SIMPLE:
+            self.last_simplified = len(visible) - sum(
+                1 for animal in farm.selection if animal in animal_state)
+        
+        # Panel UI
+        ui_state = farm._ui_regions()
+        for name in ui_state.keys() | self._ui_state.keys():
+            new, old = ui_state.get(name), self._ui_state.get(name)
+            if new != old:
+                dirty.extend(entry[0] for entry in (new, old) if entry is not None)
+        self._ui_state = ui_state
+        
+        # Notifikasi
+        signature = farm.messages.signature()
+        if signature != self._message_state[0]:
+            rects = [rect for _, rect in farm._message_layout()]
+            dirty.extend(rects)
+            dirty.extend(self._message_state[1])
+            self._message_state = (signature, rects)
+        
+        return dirty
+    
+    def _animal_blits(self):
+        blit_sequence = []
+        for animal in self._visible:
+            blit_sequence.extend(self._animal_state[animal][0])
+        return blit_sequence
+    
+    def render(self, farm, surface):
+        profiler = farm.profiler
+        screen_rect = surface.get_rect()
+        if self.background is None or self.background.size != screen_rect.size:
+            self.background = Background(screen_rect.size)
+            self._background = None
+        sky_color = self.background.sky_color(farm.time_of_day)
+        if self._background is None or sky_color != self._sky_color:
+            self._background = self.background.get(sky_color)
+            self._sky_color = sky_color
+            self._full_redraw = True
+        if farm.show_tutorial != self._show_tutorial:
+            self._show_tutorial = farm.show_tutorial
+            self._full_redraw = True
+        
+        with profiler.span("draw.collect"):
+            dirty = [rect.clip(screen_rect) for rect in self._collect_dirty(farm)]
+            dirty = self._merge_rects([rect for rect in dirty if rect.w and rect.h])
+        dirty_area = sum(r.w * r.h for r in dirty)
+        if (self._full_redraw or len(dirty) > self.max_rects
+                or dirty_area > self.max_dirty_ratio * screen_rect.w * screen_rect.h):
+            surface.blit(self._background, (0, 0))
+            # Draw animals - satu batch Surface.blits untuk seluruh herd
+            blit_sequence = self._animal_blits()
+            with profiler.span("draw.animals"):
+                surface.blits(blit_sequence, False)
+            farm._draw_overlays()
+            with profiler.span("draw.present"):
+                present()
+            self._full_redraw = False
+            self.full_redraws += 1
+            self.last_update_rects = [screen_rect]
+            self.last_draw_calls = len(blit_sequence) + 1
+            return
+        
+        if not dirty:
+            self.skipped_frames += 1
+            self.last_update_rects = []
+            self.last_draw_calls = 0
+            return
+        
+        # Partial redraw: restore background lalu gambar ulang layer yang kena clip.
+        # Panel UI adalah Surface yang di-bake, jadi digambar sepotong lewat clip
+        # hasilnya identik; overlay dilewati untuk rect yang tidak menyentuh panel.
+        animals = self._visible
+        bounds = [self._animal_state[animal][1] for animal in animals]
+        overlays = [rect for rect, _ in self._ui_state.values()] + self._message_state[1]
+        draw_calls = 0
+        for rect in dirty:
+            surface.set_clip(rect)
+            surface.blit(self._background, rect, rect)
+            blit_sequence = []
+            for index in sorted(rect.collidelistall(bounds)):
+                blit_sequence.extend(self._animal_state[animals[index]][0])
+            with profiler.span("draw.animals"):
+                surface.blits(blit_sequence, False)
+            draw_calls += len(blit_sequence)
+            if farm.show_tutorial or rect.collidelist(overlays) != -1:
+                farm._draw_overlays()
+                draw_calls += 1
+        surface.set_clip(None)
+        with profiler.span("draw.present"):
+            present(dirty)
+        self.partial_redraws += 1
+        self.last_update_rects = dirty
+        self.last_draw_calls = draw_calls
+
+
+# ==================== EVENT SCHEDULER ====================
+class ScheduledEvent:
+    """Satu event di EventScheduler - bisa di-cancel tanpa dikeluarkan dari heap"""
+    __slots__ = ("due", "seq", "callback", "args", "cancelled")
+    
+    def __init__(self, due, seq, callback, args):
+        self.due = due
+        self.seq = seq
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+    
+    def __lt__(self, other):
+        return (self.due, self.seq) < (other.due, other.seq)
+    
+    def cancel(self):
+        self.cancelled = True
+
+
+class EventScheduler:
+    """
+    Priority queue (heap) event berdasarkan tick.
+    Setiap tick hanya event yang jatuh tempo yang dijalankan, jadi biayanya
+    sebanding jumlah event yang fire, bukan jumlah hewan.
+    """
+    def __init__(self):
+        self._heap = []
+        self._seq = 0  # Tie-breaker: event dengan tick sama jalan sesuai urutan schedule
+        self.tick = 0
+        self.fired = 0
+    
+    def __len__(self):
+        return len(self._heap)
+    
+    def schedule(self, delay, callback, *args):
+        """Jalankan callback(*args) delay tick dari sekarang (minimal 1)"""
+        event = ScheduledEvent(self.tick + max(1, delay), self._seq, callback, args)
+        self._seq += 1
+        heapq.heappush(self._heap, event)
+        return event
+    
+    def advance(self, tick):
+        """Majukan waktu ke tick dan jalankan semua event yang jatuh tempo"""
+        self.tick = tick
+        heap = self._heap
+        while heap and heap[0].due <= tick:
+            event = heapq.heappop(heap)
+            if not event.cancelled:
+                self.fired += 1
+                event.callback(*event.args)
+
+
+# ==================== FIXED TIMESTEP ====================
+# Tombol kecepatan game (fast-forward)
+TIME_SCALE_KEYS = {pygame.K_1: 1, pygame.K_2: 10, pygame.K_3: 100}
+
+
+class FixedTimestep:
+    """
+    Scheduler fixed-timestep dengan accumulator.
+    Semua rate di Animal.update / Farm.update adalah per TICK, jadi game time
+    tidak ikut melambat kalau render turun di bawah FPS: tiap frame dijalankan
+    tick sebanyak waktu nyata yang lewat x time_scale. alpha = sisa accumulator
+    untuk interpolasi posisi saat render.
+    Cegah "spiral of death": waktu frame di-clamp ke max_frame_seconds, dan
+    run() berhenti begitu update makan lebih dari update_budget detik - sisa
+    tick dibuang, jadi game melambat (seperti FPS turun) tapi input tetap jalan.
+    """
+    def __init__(self, tick_rate=FPS, time_scale=1, max_frame_seconds=0.25,
+                 update_budget=0.05):
+        self.tick_rate = tick_rate
+        self.time_scale = time_scale
+        self.max_frame_seconds = max_frame_seconds  # Frame macet (drag window) tidak dikejar
+        self.update_budget = update_budget  # Detik wall-clock untuk update per frame
+        self._accumulator = 0.0
+        self.dropped_ticks = 0
+    
+    @property
+    def tick_seconds(self):
+        return 1.0 / self.tick_rate
+    
+    @property
+    def alpha(self):
+        return self._accumulator / self.tick_seconds
+    
+    def reset(self):
+        self._accumulator = 0.0
+    
+    def advance(self, frame_seconds):
+        """Tambah waktu frame ke accumulator, return jumlah tick yang harus jalan"""
+        frame_seconds = min(frame_seconds, self.max_frame_seconds)
+        self._accumulator += frame_seconds * self.time_scale
+        ticks = int(self._accumulator / self.tick_seconds)
+        self._accumulator -= ticks * self.tick_seconds
+        return ticks
+    
+    def run(self, frame_seconds, step):
+        """
+        advance() lalu panggil step() sekali per tick, sampai budget update habis.
+        Return jumlah tick yang benar-benar dijalankan.
+        """
+        ticks = self.advance(frame_seconds)
+        deadline = time.perf_counter() + self.update_budget
+        for done in range(1, ticks + 1):
+            step()
+            if done < ticks and time.perf_counter() >= deadline:
+                # CPU tidak sanggup mengejar - buang sisanya daripada makin tertinggal
+                self.dropped_ticks += ticks - done
+                self._accumulator = 0.0
+                return done
+        return ticks
+
+
+# ==================== NOTIFICATIONS ====================
+MESSAGE_CAPACITY = 32  # Notifikasi aktif maksimal (yang paling lama dibuang)
+MESSAGE_VISIBLE = 5    # Yang digambar hanya N terbaru
+
+
+class Notification:
+    """Satu notifikasi aktif; pesan yang sama berulang digabung jadi "teks ×N" """
+    __slots__ = ("text", "color", "count", "expires", "_surface")
+    
+    def __init__(self, text, color, expires):
+        self.text = text
+        self.color = color
+        self.count = 1
+        self.expires = expires  # Tick saat notifikasi hilang
+        self._surface = None
+    
+    def label(self):
+        return self.text if self.count == 1 else f"{self.text} ×{self.count}"
+    
+    def get_surface(self):
+        """Background + teks di-render sekali ke satu Surface (ulang kalau count berubah)"""
+        if self._surface is None:
+            text_surf = font_small.render(self.label(), True, self.color)
+            width, height = text_surf.get_size()
+            surface = pygame.Surface((width + 20, height + 10), pygame.SRCALPHA)
+            pygame.draw.rect(surface, (0, 0, 0), surface.get_rect(), border_radius=10)
+            surface.blit(text_surf, (10, 5))
+            self._surface = _convert_alpha(surface)
+        return self._surface
+
+
+class MessageQueue:
+    """
+    Notifikasi terbatas (bounded) dengan coalescing dan expiry per tick.
+    OrderedDict (text, color) -> Notification, urut dari yang paling cepat
+    kadaluarsa: pesan duplikat cukup count += 1 dan pindah ke ujung, expire()
+    hanya membuang dari depan, dan penuh = buang yang paling lama - semuanya
+    O(1), jadi burst notifikasi tidak memperlambat frame.
+    """
+    def __init__(self, capacity=MESSAGE_CAPACITY, max_visible=MESSAGE_VISIBLE,
+                 lifetime=MESSAGE_TICKS):
+        self.capacity = capacity
+        self.max_visible = max_visible
+        self.lifetime = lifetime
+        self.dropped = 0
+        self._active = OrderedDict()
+    
+    def __len__(self):
+        return len(self._active)
+    
+    def __iter__(self):
+        """Notifikasi aktif, lama -> baru"""
+        return iter(self._active.values())
+    
+    def push(self, text, color, tick):
+        key = (text, color)
+        note = self._active.get(key)
+        if note is None:
+            self._active[key] = Notification(text, color, tick + self.lifetime)
+            if len(self._active) > self.capacity:
+                self._active.popitem(last=False)
+                self.dropped += 1
+        else:
+            note.count += 1
+            note.expires = tick + self.lifetime
+            note._surface = None
+            self._active.move_to_end(key)
+    
+    def expire(self, tick):
+        """Buang notifikasi yang sudah lewat waktunya (selalu ada di depan)"""
+        active = self._active
+        while active:
+            key, note = next(iter(active.items()))
+            if note.expires > tick:
+                return
+            del active[key]
+    
+    def clear(self):
+        self._active.clear()
+    
+    def visible(self):
+        """max_visible notifikasi terbaru, lama -> baru"""
+        notes = list(self._active.values())
+        return notes[-self.max_visible:] if self.max_visible else []
+    
+    def signature(self):
+        """Yang menentukan tampilan - DirtyRenderer redraw kalau berubah"""
+        return tuple((note.text, note.color, note.count) for note in self.visible())
+
+
+# ==================== MISSIONS ====================
+# Definisi misi deklaratif: misi selesai kalau counter[type] >= target.
+# Counter: eggs/milk/wool (total dikumpulkan), transform (hewan yang sedang
+# transform), buy (hewan dibeli). Tambah misi baru cukup di list ini.
+MISSIONS = [
+    {"text": "Kumpulkan 3 telur!", "type": "eggs", "target": 3, "reward": 100,
+     "message": "Misi Selesai!"},
+    {"text": "Kumpulkan 2 susu!", "type": "milk", "target": 2, "reward": 80,
+     "message": "Misi Selesai!"},
+    {"text": "Transform 1 hewan!", "type": "transform", "target": 1, "reward": 150,
+     "message": "TRANSFORMASI BERHASIL!"},
+    {"text": "Kumpulkan 2 wol!", "type": "wool", "target": 2, "reward": 80,
+     "message": "Misi Selesai!"},
+    {"text": "Beli 1 hewan!", "type": "buy", "target": 1, "reward": 50,
+     "message": "Misi Beli Selesai!"},
+]
+
+
+class MissionTracker:
+    """
+    Counter incremental + misi yang subscribe ke counter.
+    Counter di-update saat event terjadi (collect, transform, beli), dan poll()
+    hanya mengecek misi milik counter yang berubah sejak poll terakhir.
+    """
+    def __init__(self, missions):
+        self.counters = {}
+        self._subscribers = {}  # counter -> misi yang belum selesai
+        self._order = {id(mission): i for i, mission in enumerate(missions)}
+        self._changed = set()
+        for mission in missions:
+            if not mission["completed"]:
+                self._subscribers.setdefault(mission["type"], []).append(mission)
+    
+    def get(self, counter):
+        return self.counters.get(counter, 0)
+    
+    def add(self, counter, amount=1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+        self._changed.add(counter)
+    
+    def set(self, counter, value):
+        """Set counter langsung (misal setelah load save)"""
+        self.counters[counter] = value
+        self._changed.add(counter)
+    
+    def poll(self):
+        """Tandai & return misi yang baru selesai - O(counter yang berubah)"""
+        if not self._changed:
+            return []
+        completed = []
+        for counter in self._changed:
+            waiting = self._subscribers.get(counter)
+            if not waiting:
+                continue
+            value = self.counters[counter]
+            done = [mission for mission in waiting if value >= mission["target"]]
+            for mission in done:
                 mission["completed"] = True
-                self.money += mission["reward"]
-                self.add_message(f"Misi Selesai! +${mission['reward']}", GOLD)
+            if done:
+                self._subscribers[counter] = [m for m in waiting if not m["completed"]]
+                completed.extend(done)
+        self._changed.clear()
+        # Urutan sama dengan list misi, bukan urutan counter berubah
+        completed.sort(key=lambda mission: self._order[id(mission)])
+        return completed
+
+# ==================== PROFILER ====================
+PROFILER_PANEL = (10, 115, 360, 250)
+PROFILER_PHASES = ("handle_events", "update", "draw")  # Span level atas
+PROFILER_EXPORT_PATH = "polymor_profile.csv"
+
+class _NullSpan:
+    """Span kosong saat profiler mati - biaya hampir nol di hot path"""
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_profiler", "_name", "_start")
+    
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+    
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self._profiler.add(self._name, (time.perf_counter() - self._start) * 1000)
+        return False
+
+
+class Profiler:
+    """
+    Instrumentasi per frame: span bernama (ms) di sekitar tiap fase Farm.run
+    dan subsystem draw/update, counter (jumlah hewan, draw call, hit rate cache),
+    rolling history untuk overlay on-screen dan export CSV/JSON.
+    """
+    def __init__(self, history=240, export_path=None, export_every=0):
+        self.enabled = False
+        self.show_overlay = False
+        self.history = deque(maxlen=history)
+        self.frame_index = 0
+        self.export_path = export_path
+        self.export_every = export_every  # Tiap N frame tulis ulang export (0 = manual)
+        self._current = {}
+        self._frame_start = None  # None = belum ada begin_frame sejak diaktifkan
+    
+    def toggle(self):
+        self.enabled = self.show_overlay = not self.enabled
+        if self.enabled:
+            # Toggle bisa terjadi di tengah frame (F3) - mulai bersih di frame berikutnya
+            self._current = {}
+            self._frame_start = None
+            self.history.clear()
+    
+    def span(self, name):
+        """with profiler.span("update"): ... - catat durasi ke frame sekarang"""
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+    
+    def add(self, name, ms):
+        """Akumulasi ms ke span name (span yang sama bisa terjadi berkali-kali)"""
+        self._current[name] = self._current.get(name, 0.0) + ms
+    
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._current = {}
+        self._frame_start = time.perf_counter()
+    
+    def end_frame(self, **counters):
+        if not self.enabled or self._frame_start is None:
+            return
+        record = {"frame": self.frame_index,
+                  "frame_ms": (time.perf_counter() - self._frame_start) * 1000}
+        self._frame_start = None
+        record.update(self._current)
+        record.update(counters)
+        self.history.append(record)
+        self.frame_index += 1
+        if self.export_path and self.export_every and self.frame_index % self.export_every == 0:
+            self.export(self.export_path)
+    
+    def averages(self):
+        """Rata-rata setiap kolom numerik di history"""
+        totals = {}
+        for record in self.history:
+            for key, value in record.items():
+                if key != "frame":
+                    totals[key] = totals.get(key, 0.0) + value
+        count = len(self.history) or 1
+        return {key: value / count for key, value in totals.items()}
+    
+    def export(self, path):
+        """Tulis rolling history ke path (.csv atau .json)"""
+        records = list(self.history)
+        if path.endswith(".csv"):
+            columns = []
+            for record in records:
+                columns.extend(key for key in record if key not in columns)
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=columns, restval=0)
+                writer.writeheader()
+                writer.writerows(records)
+        else:
+            with open(path, "w") as f:
+                json.dump(records, f, indent=1)
+        return path
+
+
+# ==================== SAVE / LOAD (SNAPSHOT) ====================
+SAVE_PATH = "polymor_farm.sav"
+SNAPSHOT_MAGIC = b"PFRM"
+SNAPSHOT_VERSION = 3  # v2: total produk per product key, v3: ukuran dunia
+SNAPSHOT_BLOCK = 4096  # Hewan per block - save_farm tidak pernah pegang kolom lebih dari ini
+
+_SNAPSHOT_HEADER = struct.Struct("<4sH")
+# money, day, tick, time_of_day, sim_time_ms, show_tutorial, selected, world_w, world_h
+_SNAPSHOT_FARM = struct.Struct("<qqqdd?qII")
+# v2: money, day, tick, time_of_day, sim_time_ms, show_tutorial, selected
+_SNAPSHOT_FARM_V2 = struct.Struct("<qqqdd?q")
+# v1: money, eggs, milk, wool, day, tick, time_of_day, sim_time_ms, show_tutorial, selected
+_SNAPSHOT_FARM_V1 = struct.Struct("<qqqqqqdd?q")
+_SNAPSHOT_COUNT = struct.Struct("<H")
+_SNAPSHOT_COUNTER = struct.Struct("<q")
+_SNAPSHOT_BLOCK = struct.Struct("<BI")  # species code, jumlah hewan (code 0 = akhir file)
+
+SNAPSHOT_SPECIES = {definition.code: definition.cls for definition in SPECIES.values()}
+
+# (nama kolom, typecode array) - kolom yang sama untuk semua species
+SNAPSHOT_COLUMNS = [
+    ("order", "q"),  # Index di Farm.animals (urutan draw & klik)
+    ("x", "d"), ("y", "d"), ("target_x", "d"), ("target_y", "d"),
+    ("hunger", "d"), ("energy", "d"), ("happiness", "d"), ("health", "d"),
+    ("age", "q"), ("last_interaction", "d"),
+    ("movement_timer", "q"), ("product_timer", "q"),
+    ("transformed", "B"), ("products", "q"),
+]
+# Kolom yang dipegang HerdStore saat vectorized
+HERD_FIELDS = frozenset(HerdStore.FLOAT_FIELDS + HerdStore.INT_FIELDS + ("transformed",))
+# Kolom tambahan per recipe (berlaku juga untuk subclass-nya)
+SNAPSHOT_EXTRA_COLUMNS = {
+    Sheep: [("wool_r", "B"), ("wool_g", "B"), ("wool_b", "B")],
+}
+
+
+class SnapshotError(Exception):
+    """File save tidak valid / versi tidak dikenal"""
+
+
+def _snapshot_columns(cls):
+    for base in cls.__mro__:
+        if base in SNAPSHOT_EXTRA_COLUMNS:
+            return SNAPSHOT_COLUMNS + SNAPSHOT_EXTRA_COLUMNS[base]
+    return SNAPSHOT_COLUMNS
+
+
+def _read_exact(f, size):
+    """Baca tepat size byte - file yang berhenti lebih awal berarti save rusak"""
+    data = f.read(size)
+    if len(data) != size:
+        raise SnapshotError("file terpotong")
+    return data
+
+
+def _read_struct(f, layout):
+    return layout.unpack(_read_exact(f, layout.size))
+
+
+def _write_named(f, pairs):
+    """Daftar (nama, int) - dipakai untuk counter misi dan total produk"""
+    f.write(_SNAPSHOT_COUNT.pack(len(pairs)))
+    for name, value in pairs:
+        encoded = name.encode("utf-8")
+        f.write(bytes([len(encoded)]) + encoded + _SNAPSHOT_COUNTER.pack(value))
+
+
+def _read_named(f):
+    values = {}
+    (count,) = _read_struct(f, _SNAPSHOT_COUNT)
+    for _ in range(count):
+        raw = _read_exact(f, _read_exact(f, 1)[0])
+        try:
+            name = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            raise SnapshotError("nama counter tidak valid") from None
+        (values[name],) = _read_struct(f, _SNAPSHOT_COUNTER)
+    return values
+
+
+def _write_column(f, column):
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()  # Format file selalu little-endian
+    f.write(column.tobytes())
+
+
+def _read_column(f, typecode, count):
+    column = array(typecode)
+    column.frombytes(_read_exact(f, column.itemsize * count))
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+class FarmSnapshot:
+    """
+    Salinan state farm pada satu batas tick: scalar dalam tuple dan kolom
+    hewan dalam array baru. Tidak berbagi object dengan Farm, jadi aman
+    ditulis ke disk dari thread lain sementara game terus jalan.
+    """
+    __slots__ = ("scalars", "completed", "counters", "totals", "blocks")
+    
+    def __init__(self, scalars, completed, counters, totals, blocks):
+        self.scalars = scalars      # Urutan field _SNAPSHOT_FARM
+        self.completed = completed  # bytes, 1 per misi
+        self.counters = counters    # tuple (nama, nilai)
+        self.totals = totals        # tuple (product key, total)
+        self.blocks = blocks        # (code, jumlah, [array per kolom]) - tuple atau generator
+
+
+def capture_snapshot(farm, stream=False):
+    """
+    Copy state farm ke FarmSnapshot (bagian murah, di main thread).
+    stream=True -> blocks berupa generator yang meng-copy satu block saat
+    ditulis; hanya untuk penulisan sinkron, farm tidak boleh berubah dulu.
+    """
+    order = {animal: index for index, animal in enumerate(farm.animals)}
+    scalars = (farm.money, farm.day, farm.tick, farm.time_of_day, farm.sim_time_ms,
+               farm.show_tutorial, order.get(farm.selected_animal, -1), *farm.world.size)
+    completed = bytes(mission["completed"] for mission in farm.missions)
+    # Counter "transform" dihitung ulang dari hewan saat load
+    counters = tuple((name, value) for name, value in farm.mission_tracker.counters.items()
+                     if name != "transform")
+    totals = tuple(farm.product_totals.items())
+    blocks = _snapshot_blocks(farm, order)
+    if not stream:
+        blocks = tuple(blocks)  # Salinan penuh - aman untuk thread writer AutoSaver
+    return FarmSnapshot(scalars, completed, counters, totals, blocks)
+
+
+def _snapshot_blocks(farm, order):
+    """Generator block kolom per species, maksimal SNAPSHOT_BLOCK hewan per block"""
+    # Satu pass: kelompokkan hewan per species
+    groups = {definition: [] for definition in SPECIES.values()}
+    for animal in farm.animals:
+        groups[animal.species_def].append(animal)
+    
+    for definition, herd in groups.items():
+        code = definition.code
+        columns = _snapshot_columns(definition.cls)
+        for start in range(0, len(herd), SNAPSHOT_BLOCK):
+            block = herd[start:start + SNAPSHOT_BLOCK]
+            # Baris tuple per hewan -> kolom (kolom pertama = order)
+            rows = zip(*[animal._snapshot_row() for animal in block])
+            arrays = [array("q", [order[animal] for animal in block])]
+            arrays.extend(array(typecode, values)
+                          for (name, typecode), values in zip(columns[1:], rows))
+            if farm.herd is not None:
+                # State terbaru ada di array HerdStore - copy satu kolom sekaligus
+                slots = [animal._slot for animal in block]
+                for index, (name, typecode) in enumerate(columns):
+                    if name in HERD_FIELDS:
+                        arrays[index] = farm.herd.gather(name, slots, typecode)
+            yield (code, len(block), arrays)
+
+
+def write_snapshot(snapshot, f):
+    """
+    Tulis FarmSnapshot ke file binary f (streaming).
+    Format: header versi, scalar farm, misi & counter, lalu block per species
+    berisi kolom-kolom array (struct-of-arrays), bukan object yang di-pickle.
+    """
+    f.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+    f.write(_SNAPSHOT_FARM.pack(*snapshot.scalars))
+    
+    f.write(_SNAPSHOT_COUNT.pack(len(snapshot.completed)))
+    f.write(snapshot.completed)
+    
+    _write_named(f, snapshot.counters)
+    _write_named(f, snapshot.totals)
+    
+    for code, count, columns in snapshot.blocks:
+        f.write(_SNAPSHOT_BLOCK.pack(code, count))
+        for column in columns:
+            _write_column(f, column)
+    f.write(_SNAPSHOT_BLOCK.pack(0, 0))
+
+
+def save_farm(farm, f):
+    """Snapshot + tulis langsung (sinkron) ke file binary f, block demi block"""
+    write_snapshot(capture_snapshot(farm, stream=True), f)
+
+
+def load_farm(f, farm=None, **farm_kwargs):
+    """
+    Baca snapshot dari file binary f.
+    farm=None -> buat Farm baru (farm_kwargs diteruskan ke Farm), selain itu
+    state farm yang diberikan diganti. Return farm.
+    Ukuran dunia ikut dipulihkan (v3); save lama memakai dunia farm sekarang.
+    """
+    world_size = None
+    magic, version = _read_struct(f, _SNAPSHOT_HEADER)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("bukan file save Polymor-Farm")
+    if version == 1:
+        (money, eggs, milk, wool, day, tick, time_of_day, sim_time_ms,
+         show_tutorial, selected) = _read_struct(f, _SNAPSHOT_FARM_V1)
+        totals = {"eggs": eggs, "milk": milk, "wool": wool}
+    elif version == 2:
+        (money, day, tick, time_of_day, sim_time_ms,
+         show_tutorial, selected) = _read_struct(f, _SNAPSHOT_FARM_V2)
+    elif version == SNAPSHOT_VERSION:
+        (money, day, tick, time_of_day, sim_time_ms,
+         show_tutorial, selected, *world_size) = _read_struct(f, _SNAPSHOT_FARM)
+        try:
+            world_size = check_world_size(world_size)
+        except ValueError as error:
+            raise SnapshotError(str(error)) from None
+    else:
+        raise SnapshotError(f"versi save {version} tidak didukung")
+    
+    (mission_count,) = _read_struct(f, _SNAPSHOT_COUNT)
+    completed = _read_exact(f, mission_count)
+    counters = _read_named(f)
+    if version >= 2:
+        totals = _read_named(f)
+    
+    loaded = []
+    while True:
+        code, count = _read_struct(f, _SNAPSHOT_BLOCK)
+        if code == 0:
+            break
+        cls = SNAPSHOT_SPECIES.get(code)
+        if cls is None:
+            raise SnapshotError(f"species code {code} tidak dikenal")
+        columns = {name: _read_column(f, typecode, count)
+                   for name, typecode in _snapshot_columns(cls)}
+        for i in range(count):
+            state = {name: column[i] for name, column in columns.items()}
+            state["transformed"] = bool(state["transformed"])
+            if "wool_r" in state:
+                state["wool_color"] = (state["wool_r"], state["wool_g"], state["wool_b"])
+            animal = cls(state["x"], state["y"])
+            animal._import_state(state)
+            loaded.append((state["order"], animal))
+    loaded.sort(key=lambda item: item[0])
+    
+    if farm is None:
+        farm = Farm(populate=False, **farm_kwargs)
+    else:
+        farm._reset_world()
+    if world_size is not None:
+        farm._set_world(world_size)  # Sebelum add_animal - hewan ambil pasture baru
+    farm.money = money
+    farm.product_totals = dict.fromkeys(PRODUCT_KEYS, 0)
+    farm.product_totals.update(totals)
+    farm.day = day
+    farm.tick = farm.events.tick = tick  # Event dijadwalkan relatif ke tick ini
+    farm.time_of_day = time_of_day
+    farm.sim_time_ms = sim_time_ms
+    farm.show_tutorial = show_tutorial
+    
+    farm.missions = farm._create_missions()
+    for mission, done in zip(farm.missions, completed):
+        mission["completed"] = bool(done)
+    farm.mission_tracker = MissionTracker(farm.missions)
+    
+    for _, animal in loaded:
+        farm.add_animal(animal)
+    for name, value in counters.items():
+        farm.mission_tracker.set(name, value)
+    
+    if 0 <= selected < len(farm.animals):
+        farm._set_selection([farm.animals[selected]])
+    return farm
+
+
+# ==================== AUTOSAVE ====================
+AUTOSAVE_PATH = "polymor_farm_autosave.sav"
+AUTOSAVE_SECONDS = 60  # Interval default (detik wall-clock)
+
+
+class AutoSaver:
+    """
+    Autosave periodik tanpa freeze di game loop.
+    Main thread hanya capture_snapshot() di batas tick; thread writer yang
+    serialize, fsync dan os.replace file (atomic - file lama tetap utuh
+    kalau game crash di tengah penulisan). Queue dibatasi: kalau writer
+    tertinggal, snapshot lama yang belum ditulis diganti yang terbaru.
+    """
+    def __init__(self, path=AUTOSAVE_PATH, interval=AUTOSAVE_SECONDS, max_pending=1,
+                 history=32):
+        self.path = path
+        self.interval = interval
+        self.capture_ms = deque(maxlen=history)
+        self.write_ms = deque(maxlen=history)
+        self.saves = 0
+        self.dropped = 0  # Snapshot yang diganti sebelum sempat ditulis
+        self.failures = 0
+        self.last_error = None
+        self.last_bytes = 0
+        self._last_save = time.perf_counter()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._writer, name="autosave", daemon=True)
+        self._thread.start()
+    
+    def maybe_save(self, farm):
+        """Dipanggil tiap tick - autosave kalau interval sudah lewat"""
+        if time.perf_counter() - self._last_save >= self.interval:
+            self.save(farm)
+    
+    def save(self, farm):
+        """Capture sekarang, tulis di background"""
+        start = time.perf_counter()
+        snapshot = capture_snapshot(farm)
+        self._last_save = time.perf_counter()
+        self.capture_ms.append((self._last_save - start) * 1000)
+        try:
+            self._queue.put_nowait(snapshot)
+        except queue.Full:
+            try:
+                self._queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass  # Writer baru saja mengambilnya
+            self._queue.put(snapshot)
+    
+    def _writer(self):
+        while True:
+            snapshot = self._queue.get()
+            if snapshot is None:
+                return
+            start = time.perf_counter()
+            temp_path = self.path + ".tmp"
+            try:
+                with open(temp_path, "wb") as f:
+                    write_snapshot(snapshot, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self.last_bytes = f.tell()
+                os.replace(temp_path, self.path)
+            except Exception as error:  # Thread writer harus tetap hidup apa pun errornya
+                self.failures += 1
+                self.last_error = error
+            else:
+                self.saves += 1
+            self.write_ms.append((time.perf_counter() - start) * 1000)
+    
+    def stats(self):
+        """Metrik rata-rata capture (main thread) vs write (thread writer)"""
+        def average(values):
+            values = list(values)
+            return sum(values) / len(values) if values else 0.0
+        return {
+            "saves": self.saves,
+            "dropped": self.dropped,
+            "failures": self.failures,
+            "capture_ms": average(self.capture_ms),
+            "write_ms": average(self.write_ms),
+            "bytes": self.last_bytes,
+        }
+    
+    def close(self, timeout=10.0):
+        """Tunggu snapshot yang tersisa selesai ditulis lalu hentikan thread"""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return  # Writer macet (disk lambat?) - thread daemon, jangan tahan exit
+        self._thread.join(timeout)
+
+
+# ==================== INPUT RECORD / REPLAY ====================
+REPLAY_VERSION = 1
+# Tombol gameplay -> action. Tombol lain (F3, F5, kecepatan) tidak mengubah simulasi
+ACTION_KEYS = {
+    pygame.K_SPACE: "start",
+    pygame.K_s: "shop",
+    pygame.K_f: "feed",
+    pygame.K_p: "pet",
+    pygame.K_c: "collect",
+}
+
+
+class InputRecorder:
+    """
+    Rekam action Farm.do_action beserta tick-nya. Dengan seed yang sama,
+    sesi bisa diputar ulang persis (replay_session) tanpa window dan secepat
+    CPU - untuk profiling dan regression test. Rekaman dimulai dari farm
+    baru; load save (F9) di tengah sesi tidak ikut direkam.
+    """
+    def __init__(self, farm, path):
+        self.path = path
+        self.seed = farm.seed
+        self.vectorized = farm.herd is not None
+        self.rng_substreams = farm.rng_substreams
+        self.world = list(farm.world.size)
+        self.actions = []
+    
+    def record(self, tick, action, *args):
+        self.actions.append([tick, action, *args])
+    
+    def save(self, farm):
+        """Tulis log JSON; digest state akhir dipakai replay untuk verifikasi"""
+        log = {
+            "version": REPLAY_VERSION,
+            "seed": self.seed,
+            "vectorized": self.vectorized,
+            "rng_substreams": self.rng_substreams,
+            "world": self.world,
+            "end_tick": farm.tick,
+            "digest": farm.state_digest(),
+            "actions": self.actions,
+        }
+        with open(self.path, "w") as f:
+            json.dump(log, f)
+        return self.path
+
+
+def load_replay(path):
+    with open(path) as f:
+        log = json.load(f)
+    if log.get("version") != REPLAY_VERSION:
+        raise ValueError(f"versi replay {log.get('version')} tidak didukung")
+    return log
+
+
+def replay_session(log, profiler=None):
+    """
+    Putar ulang log InputRecorder di farm headless baru.
+    Action dijalankan di tick yang sama seperti saat direkam, di antaranya
+    update() tanpa jeda. Return farm di tick akhir.
+    """
+    farm = Farm(vectorized=log["vectorized"], headless=True, seed=log["seed"],
+                rng_substreams=log["rng_substreams"],
+                world_size=tuple(log.get("world", (WIDTH, HEIGHT))))
+    if profiler is not None:
+        farm.profiler = profiler
+    actions = log["actions"]
+    index = 0
+    while True:
+        while index < len(actions) and actions[index][0] == farm.tick:
+            farm.do_action(*actions[index][1:])
+            index += 1
+        if farm.tick >= log["end_tick"]:
+            return farm
+        farm.profiler.begin_frame()
+        with farm.profiler.span("update"):
+            farm.update()
+        farm.profiler.end_frame(animals=len(farm.animals))
+
+
+# ==================== WORLD & CAMERA ====================
+CAMERA_PAN_STEP = 15  # Pixel layar per frame saat tombol panah ditekan
+CAMERA_ZOOM_STEP = 1.25  # Faktor per scroll / tombol - =
+OFFSCREEN_TICKS = 4  # Hewan di luar kamera di-update tiap N tick (N tick sekaligus)
+WORLD_MAX = 2 ** 31 - 1  # pygame.Rect memakai int32
+
+
+def check_world_size(world_size):
+    """
+    Return (lebar, tinggi) kalau valid: minimal ukuran layar (pasture dan area
+    spawn butuh ruang) dan muat di int32. Selain itu ValueError.
+    """
+    width, height = world_size
+    if not (WIDTH <= width <= WORLD_MAX and HEIGHT <= height <= WORLD_MAX):
+        raise ValueError(f"ukuran dunia {width}x{height} tidak valid, "
+                         f"minimal {WIDTH}x{HEIGHT} dan maksimal {WORLD_MAX}")
+    return (width, height)
+
+
+def pasture_bounds(world_w, world_h):
+    """Area tujuan jalan hewan (x0, x1, y0, y1) di dunia berukuran world_w x world_h"""
+    return (150, world_w - 150, 250, world_h - 200)
+
+
+def spawn_bounds(world_w, world_h):
+    """Area muncul hewan baru dari toko (x0, x1, y0, y1)"""
+    return (200, world_w - 200, 300, world_h - 200)
+
+
+DEFAULT_PASTURE = pasture_bounds(WIDTH, HEIGHT)
+
+
+class Camera:
+    """
+    Bagian dunia yang tampil di layar logis: pojok kiri-atas (koordinat dunia)
+    dan zoom. Zoom maksimal 1 (sprite ukuran asli), minimal sampai seluruh
+    dunia muat di layar. Posisi selalu di-clamp ke dalam dunia.
+    """
+    __slots__ = ("world", "screen_size", "x", "y", "zoom")
+    
+    def __init__(self, world, screen_size=(WIDTH, HEIGHT)):
+        self.world = world
+        self.screen_size = screen_size
+        self.x = world.x
+        self.y = world.y
+        self.zoom = 1.0
+    
+    def min_zoom(self):
+        return min(1.0, self.screen_size[0] / self.world.w, self.screen_size[1] / self.world.h)
+    
+    def transform(self):
+        """(x, y, zoom) - dipakai Animal.get_blits dan action "view" """
+        return (self.x, self.y, self.zoom)
+    
+    def view_rect(self):
+        """Area dunia yang terlihat"""
+        width, height = self.screen_size
+        return pygame.Rect(int(self.x), int(self.y),
+                           math.ceil(width / self.zoom), math.ceil(height / self.zoom))
+    
+    def to_world(self, pos):
+        """Posisi layar logis -> posisi dunia"""
+        return (self.x + pos[0] / self.zoom, self.y + pos[1] / self.zoom)
+    
+    def to_world_rect(self, rect):
+        rect = pygame.Rect(rect)
+        left, top = self.to_world(rect.topleft)
+        right, bottom = self.to_world(rect.bottomright)
+        return pygame.Rect(int(left), int(top), math.ceil(right - left), math.ceil(bottom - top))
+    
+    def clamped(self, x, y, zoom):
+        """(x, y, zoom) yang valid: zoom di [min_zoom, 1], view di dalam dunia (tengah kalau muat)"""
+        zoom = max(self.min_zoom(), min(1.0, zoom))
+        width, height = self.screen_size[0] / zoom, self.screen_size[1] / zoom
+        world = self.world
+        x = world.centerx - width / 2 if width >= world.w else max(world.left, min(world.right - width, x))
+        y = world.centery - height / 2 if height >= world.h else max(world.top, min(world.bottom - height, y))
+        return (x, y, zoom)
+    
+    def move_to(self, x, y, zoom=None):
+        self.x, self.y, self.zoom = self.clamped(x, y, self.zoom if zoom is None else zoom)
+    
+    def pan_target(self, dx, dy):
+        """Transform setelah geser dx, dy pixel layar"""
+        return self.clamped(self.x + dx / self.zoom, self.y + dy / self.zoom, self.zoom)
+    
+    def zoom_target(self, factor, screen_pos):
+        """Transform setelah zoom dengan faktor, titik dunia di bawah screen_pos tetap diam"""
+        world_x, world_y = self.to_world(screen_pos)
+        zoom = max(self.min_zoom(), min(1.0, self.zoom * factor))
+        return self.clamped(world_x - screen_pos[0] / zoom, world_y - screen_pos[1] / zoom, zoom)
+
+
+# ==================== GAME MANAGER ====================
+SHOP_BUTTON_TOP = 120
+SHOP_BUTTON_STEP = 60
+FEED_COST = 5    # Dari $10 jadi $5
+FEED_VALUE = 40  # Lebih kenyang
+DRAG_THRESHOLD = 6  # Pixel geser minimal sebelum klik jadi drag-box
+
+
+def _total_property(product_key):
+    """Attribute lama total_eggs/total_milk/total_wool -> product_totals"""
+    def getter(self):
+        return self.product_totals.get(product_key, 0)
+    
+    def setter(self, value):
+        self.product_totals[product_key] = value
+    return property(getter, setter)
+
+
+class Farm:
+    """Main game class dengan composition"""
+    total_eggs = _total_property("eggs")
+    total_milk = _total_property("milk")
+    total_wool = _total_property("wool")
+    
+    def __init__(self, vectorized=False, headless=False, tick_rate=FPS, populate=True,
+                 seed=None, rng_substreams=False, world_size=None):
+        """
+        vectorized = pakai HerdStore (NumPy) untuk update herd.
+        headless = tanpa display/font/clock, untuk simulasi di CI atau worker.
+        tick_rate = tick simulasi per detik pada kecepatan x1.
+        populate = spawn 3 hewan awal (False untuk load dari save).
+        seed = seed RNG farm (None = acak); seed sama + input sama = hasil sama.
+        rng_substreams = tiap hewan dapat random.Random sendiri (diturunkan dari
+        RNG farm), jadi urutan event tidak mengubah angka acak hewan lain.
+        world_size = (lebar, tinggi) dunia farm (default ukuran layar); dunia
+        yang lebih besar dilihat lewat kamera (panah = geser, scroll = zoom).
+        """
+        self.headless = headless
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.rng_substreams = rng_substreams
+        self.recorder = None  # InputRecorder saat --record
+        if not headless:
+            init_display()
+        self.animals = []
+        # Koordinat dunia terpisah dari layar; kamera memilih bagian yang tampil
+        self._set_world(world_size or (WIDTH, HEIGHT))
+        self._sim_synced = True  # Semua hewan di-update sampai tick sekarang
+        # Backend vectorized opsional (NumPy) - None = update per object
+        self.herd = HerdStore() if vectorized else None
+        # Index posisi untuk klik dan query area/tetangga
+        self.grid = SpatialGrid()
+        self.renderer = DirtyRenderer()
+        # Timer produksi, retarget dan notifikasi sebagai event (heap)
+        self.events = EventScheduler()
+        # Simulasi fixed-timestep, terpisah dari frame rate render
+        self.timestep = FixedTimestep(tick_rate)
+        self.render_alpha = 1.0
+        # Instrumentasi (F3 = overlay, F4 = export)
+        self.profiler = Profiler()
+        self.autosaver = None  # AutoSaver, di-set oleh main() / pemanggil
+        self.selected_animal = None  # Hewan utama (panel info)
+        self.selection = []  # Semua hewan terpilih (klik = 1, drag-box = banyak)
+        self._drag_start = None
+        self._drag_rect = None
+        self.money = 500  # Lebih banyak uang awal!
+        self.product_totals = dict.fromkeys(PRODUCT_KEYS, 0)  # Product key -> total terkumpul
+        self.day = 1
+        self.time_of_day = 0  # 0-1000 (morning to night)
+        self.tick = 0
+        self.sim_time_ms = 0  # Waktu simulasi (dipakai sebagai "now" saat headless)
+        self.missions = self._create_missions()
+        self.mission_tracker = MissionTracker(self.missions)
+        self.tutorial_step = 0
+        self.show_tutorial = True
+        
+        # UI state
+        self.show_shop = False
+        self.messages = MessageQueue()
+        
+        # Spawn initial animals - lebih rapi
+        if populate:
+            self.add_animal(Chicken(250, 400))
+            self.add_animal(Cow(500, 400))
+            self.add_animal(Sheep(750, 400))
+        
+    def _create_missions(self):
+        """Create mission list (copy dari MISSIONS supaya state per farm)"""
+        return [dict(mission, completed=False) for mission in MISSIONS]
+    
+    def _set_world(self, world_size):
+        """Ganti ukuran dunia: pasture dan kamera dibangun ulang untuk dunia baru"""
+        self.world = pygame.Rect((0, 0), check_world_size(world_size))
+        self.pasture = pasture_bounds(*self.world.size)
+        self.camera = Camera(self.world)
+    
+    def _reset_world(self):
+        """Kosongkan hewan dan semua index/jadwal yang memegangnya (sebelum load)"""
+        self.animals = []
+        self.selected_animal = None
+        self.selection = []
+        self.herd = HerdStore() if self.herd is not None else None
+        self.grid = SpatialGrid()
+        self.events = EventScheduler()
+        self.renderer = DirtyRenderer(lod=self.renderer.lod)  # Setting LOD tetap
+        self._sim_synced = True
+        self.messages.clear()
+    
+    def save(self, path=SAVE_PATH):
+        """Simpan seluruh state farm ke file snapshot binary"""
+        with open(path, "wb") as f:
+            save_farm(self, f)
+        return path
+    
+    def load(self, path=SAVE_PATH):
+        """Ganti state farm ini dengan isi file snapshot"""
+        with open(path, "rb") as f:
+            load_farm(f, farm=self)
+    
+    def add_animal(self, animal):
+        """Tambah hewan ke farm (dan ke HerdStore kalau vectorized)"""
+        self.animals.append(animal)
+        animal._observer = self
+        animal._rng = (random.Random(self.rng.getrandbits(64)) if self.rng_substreams
+                       else self.rng)
+        animal._pasture = self.pasture
+        animal._sim_tick = self.tick
+        if animal.is_transformed():
+            self.mission_tracker.add("transform")
+        self.grid.insert(animal)
+        if self.herd is not None:
+            self.herd.bind(animal)  # HerdStore.step mengurus timer sendiri (vectorized)
+        else:
+            animal.attach_scheduler(self.events)
+    
+    def add_message(self, text, color=YELLOW):
+        """Tambah notifikasi (duplikat yang masih tampil digabung jadi ×N)"""
+        self.messages.push(text, color, self.tick)
+    
+    def handle_events(self):
+        """Handle user input"""
+        if self.headless:
+            return True
+        
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
             
-            elif mission["type"] == "milk" and self.total_milk >= mission["target"]:
-                mission["completed"] = True
-                self.money += mission["reward"]
-                self.add_message(f"Misi Selesai! +${mission['reward']}", GOLD)
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.renderer.invalidate()
             
-            elif mission["type"] == "wool" and self.total_wool >= mission["target"]:
-                mission["completed"] = True
-                self.money += mission["reward"]
-                self.add_message(f"Misi Selesai! +${mission['reward']}", GOLD)
+            if event.type == pygame.VIDEORESIZE:
+                resize_display()
+                self.renderer.invalidate()
             
-            elif mission["type"] == "transform":
-                transform_count = sum(1 for a in self.animals if a.is_transformed())
-                if transform_count >= mission["target"]:
-                    mission["completed"] = True
-                    self.money += mission["reward"]
-                    self.add_message(f"TRANSFORMASI BERHASIL! +${mission['reward']}", GOLD)
+            # Input mouse dalam koordinat logis (window bisa di-scale)
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1:  # Left click
+                    pos = viewport.to_logical(event.pos)
+                    self.do_action("click", *pos)
+                    if not self.show_shop and not self.show_tutorial:
+                        self._drag_start = pos
             
-            elif mission["type"] == "buy" and len(self.animals) >= mission["target"] + 3:
-                mission["completed"] = True
-                self.money += mission["reward"]
-                self.add_message(f"Misi Beli Selesai! +${mission['reward']}", GOLD)
+            if event.type == pygame.MOUSEMOTION and self._drag_start is not None:
+                self._update_drag(viewport.to_logical(event.pos))
+            
+            if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                if self._drag_rect is not None:
+                    self.do_action("box", *self._drag_rect)
+                self._drag_start = self._drag_rect = None
+            
+            if event.type == pygame.MOUSEWHEEL:
+                pos = viewport.to_logical(pygame.mouse.get_pos())
+                self._set_view(self.camera.zoom_target(CAMERA_ZOOM_STEP ** event.y, pos))
+            
+            if event.type == pygame.KEYDOWN:
+                if event.key in ACTION_KEYS:
+                    self.do_action(ACTION_KEYS[event.key])
+                elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_MINUS):
+                    factor = CAMERA_ZOOM_STEP if event.key != pygame.K_MINUS else 1 / CAMERA_ZOOM_STEP
+                    self._set_view(self.camera.zoom_target(factor, (WIDTH // 2, HEIGHT // 2)))
+                elif event.key == pygame.K_F5:
+                    self.add_message(f"Tersimpan: {self.save()}", LIGHT_BLUE)
+                elif event.key == pygame.K_F9:
+                    self._load_from_key()
+                elif event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                    self.renderer.invalidate()
+                elif event.key == pygame.K_F4:
+                    path = self.profiler.export(self.profiler.export_path or PROFILER_EXPORT_PATH)
+                    self.add_message(f"Profil disimpan: {path}", LIGHT_BLUE)
+                elif event.key in TIME_SCALE_KEYS:
+                    self.timestep.time_scale = TIME_SCALE_KEYS[event.key]
+                    self.add_message(f"Kecepatan x{self.timestep.time_scale}", LIGHT_BLUE)
+        
+        # Geser kamera selama tombol panah ditahan
+        keys = pygame.key.get_pressed()
+        dx = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * CAMERA_PAN_STEP
+        dy = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * CAMERA_PAN_STEP
+        if dx or dy:
+            self._set_view(self.camera.pan_target(dx, dy))
+        return True
+    
+    def _set_view(self, view):
+        """Pindah kamera lewat action "view" (direkam: simulasi di luar kamera bergantung padanya)"""
+        if view != self.camera.transform():
+            self.do_action("view", *view)
+    
+    def do_action(self, action, *args):
+        """
+        Jalankan satu input gameplay (lihat ACTION_KEYS, "click", "box" dan "view").
+        Semua input yang mengubah simulasi lewat sini supaya bisa direkam.
+        """
+        if self.recorder is not None:
+            self.recorder.record(self.tick, action, *args)
+        if action == "click":
+            self._handle_click(args)
+        elif action == "box":
+            self.select_box(pygame.Rect(args))
+        elif action == "view":
+            self.camera.move_to(*args)
+        elif action == "start":
+            self.show_tutorial = False
+        elif action == "shop":
+            self.show_shop = not self.show_shop
+        elif action == "feed":
+            self._feed_selected()
+        elif action == "pet":
+            self._pet_selected()
+        elif action == "collect":
+            self._collect_products()
+        else:
+            raise ValueError(f"action tidak dikenal: {action}")
+    
+    def state_digest(self):
+        """Hash SHA-1 dari snapshot state - untuk cek replay / regression"""
+        buffer = io.BytesIO()
+        save_farm(self, buffer)
+        return hashlib.sha1(buffer.getvalue()).hexdigest()
+    
+    def _load_from_key(self):
+        """F9 - load save default kalau ada"""
+        try:
+            self.load()
+        except FileNotFoundError:
+            self.add_message("Belum ada save!", RED)
+        except SnapshotError as error:
+            self.add_message(f"Save rusak: {error}", RED)
+        else:
+            self.add_message("Save dimuat!", LIGHT_BLUE)
+    
+    def _handle_click(self, pos):
+        """Handle mouse click"""
+        # Check shop buttons
+        if self.show_shop:
+            self._check_shop_click(pos)
+            return
+        
+        # Check animal selection (lewat spatial grid, bukan scan semua hewan)
+        animal = self.grid.pick(self.camera.to_world(pos))
+        if animal is not None:
+            self._set_selection([animal])
+            self.add_message(f"Dipilih: {animal.get_name()}")
+            return
+        
+        # Deselect if click empty space
+        self._set_selection([])
+    
+    def _update_drag(self, pos):
+        """Drag-box aktif setelah mouse bergeser lebih dari DRAG_THRESHOLD"""
+        x0, y0 = self._drag_start
+        rect = pygame.Rect(min(x0, pos[0]), min(y0, pos[1]), abs(pos[0] - x0), abs(pos[1] - y0))
+        if self._drag_rect is not None or max(rect.w, rect.h) > DRAG_THRESHOLD:
+            self._drag_rect = tuple(rect)
+    
+    def _set_selection(self, animals):
+        """Ganti seleksi; hewan pertama jadi selected_animal (panel info)"""
+        for animal in self.selection:
+            animal.deselect()
+        self.selection = list(animals)
+        for animal in self.selection:
+            animal.select()
+        self.selected_animal = self.selection[0] if self.selection else None
+    
+    def select_box(self, rect):
+        """Pilih semua hewan yang titik tengahnya di dalam rect layar (query SpatialGrid)"""
+        animals = self.grid.query_rect(self.camera.to_world_rect(rect))
+        self._set_selection(animals)
+        if animals:
+            self.add_message(f"Dipilih: {len(animals)} hewan")
+        return animals
+    
+    def feed_all(self, animals=None):
+        """
+        Kasih makan banyak hewan (default: seleksi) dalam satu pass.
+        Uang dipotong sekali, satu pesan ringkasan, satu cek misi.
+        Kalau uang kurang, hanya sebanyak yang terbayar. Return jumlah yang diberi makan.
+        """
+        animals = self.selection if animals is None else animals
+        if self.money < FEED_COST:
+            self.add_message("Uang tidak cukup!", RED)
+            return 0
+        fed = animals[:self.money // FEED_COST]
+        if not fed:
+            return 0
+        if self.herd is not None:
+            self.herd.feed([animal._slot for animal in fed], FEED_VALUE)
+        else:
+            for animal in fed:
+                animal.feed(FEED_VALUE)
+        cost = FEED_COST * len(fed)
+        self.money -= cost
+        if len(fed) == 1:
+            self.add_message("Dikasih makan!", GREEN)
+        else:
+            skipped = len(animals) - len(fed)
+            self.add_message(f"{len(fed)} hewan dikasih makan! -${cost}"
+                             + (f" ({skipped} tidak, uang habis)" if skipped else ""), GREEN)
+        self._check_missions()
+        return len(fed)
+    
+    def pet_all(self, animals=None):
+        """Elus banyak hewan sekaligus (default: seleksi). Return jumlahnya"""
+        animals = self.selection if animals is None else animals
+        if not animals:
+            return 0
+        if self.herd is not None:
+            self.herd.pet([animal._slot for animal in animals])
+        else:
+            for animal in animals:
+                animal.pet()
+        self.add_message("Dielus-elus!" if len(animals) == 1
+                         else f"{len(animals)} hewan dielus-elus!", PINK)
+        return len(animals)
+    
+    def collect_all(self, animals=None):
+        """
+        Kumpulkan produk banyak hewan (default: seleksi) - HARGA LEBIH TINGGI!
+        Total, counter misi dan uang diakumulasi per species, lalu satu pesan
+        dan satu cek misi. Return uang yang didapat.
+        """
+        animals = self.selection if animals is None else animals
+        # Dispatch lewat species_def (registry), bukan rantai isinstance
+        collected = {}
+        for animal in animals:
+            amount = animal.collect_products()
+            if amount > 0:
+                species = animal.species_def
+                collected[species] = collected.get(species, 0) + amount
+        if not collected:
+            return 0
+        
+        earned = 0
+        parts = []
+        for species, amount in collected.items():
+            key = species.product_key
+            self.product_totals[key] += amount
+            self.mission_tracker.add(key, amount)
+            earned += amount * species.product_price
+            parts.append(f"{amount} {species.product_name}")
+        self.money += earned
+        # Satu species -> warna produknya, campuran -> emas
+        color = next(iter(collected)).product_color if len(collected) == 1 else GOLD
+        self.add_message(f"Dapat {', '.join(parts)}! +${earned}", color)
+        self._check_missions()
+        return earned
+    
+    def _feed_selected(self):
+        """F - kasih makan hewan terpilih"""
+        self.feed_all()
+    
+    def _pet_selected(self):
+        """P - elus hewan terpilih"""
+        self.pet_all()
+    
+    def _collect_products(self):
+        """C - ambil hasil dari hewan terpilih"""
+        self.collect_all()
+    
+    def _check_shop_click(self, pos):
+        """Check shop button clicks (tombol ke-i = SHOP_SPECIES[i])"""
+        for i in range(len(SHOP_SPECIES)):
+            if self._shop_button_rect(i).collidepoint(pos):
+                self.buy_animal(i)
+    
+    def buy_animal(self, index):
+        """
+        Beli hewan dari toko (index di SHOP_SPECIES: 0 = Ayam, 1 = Sapi, 2 = Domba).
+        Dipisah dari _check_shop_click supaya bisa dipanggil tanpa mouse/display.
+        Return hewan baru, atau None kalau uang tidak cukup.
+        """
+        species = SHOP_SPECIES[index]
+        if self.money < species.shop_price:
+            self.add_message("Uang tidak cukup!", RED)
+            return None
+        
+        x0, x1, y0, y1 = self._spawn_area()
+        x = self.rng.randint(x0, x1)
+        y = self.rng.randint(y0, y1)
+        new_animal = species.cls(x, y)
+        self.add_animal(new_animal)
+        self.money -= species.shop_price
+        self.add_message(f"Beli {species.name}! -${species.shop_price}", GREEN)
+        self.mission_tracker.add("buy")
+        self._check_missions()
+        return new_animal
+    
+    def _spawn_area(self):
+        """spawn_bounds dunia, dipotong ke view kamera supaya hewan baru kelihatan"""
+        x0, x1, y0, y1 = spawn_bounds(*self.world.size)
+        view = self.camera.view_rect()
+        clipped = (max(x0, view.left), min(x1, view.right), max(y0, view.top), min(y1, view.bottom))
+        if clipped[0] > clipped[1] or clipped[2] > clipped[3]:
+            return (x0, x1, y0, y1)
+        return clipped
+    
+    def _check_missions(self):
+        """Check if any mission completed (hanya misi yang counter-nya berubah)"""
+        for mission in self.mission_tracker.poll():
+            self.money += mission["reward"]
+            self.add_message(f"{mission['message']} +${mission['reward']}", GOLD)
+    
+    def _on_animal_form_change(self, animal, transformed):
+        """Dipanggil Animal._apply_form saat hewan transform / kembali normal"""
+        self.mission_tracker.add("transform", 1 if transformed else -1)
+        # Ukuran berubah di tempat - radius pick grid harus ikut ukuran baru
+        if animal._grid is not None:
+            animal._grid.update(animal)
+        
+        # Transform notification - sekali per transformasi (flag eksplisit)
+        if not transformed:
+            animal._transform_notified = False
+        elif not animal._transform_notified:
+            animal._transform_notified = True
+            species = animal.species_def
+            self.add_message(species.transform_message, species.transform_message_color)
     
     def update(self):
         """Update game state"""
+        self.tick += 1
+        self.sim_time_ms += TICK_MS
+        # Selalu waktu simulasi (bukan pygame ticks) supaya bisa di-replay
+        now = self.sim_time_ms
+        
+        span = self.profiler.span
+        # Event yang jatuh tempo: retarget, produce, notifikasi kadaluarsa
+        with span("update.events"):
+            self.events.advance(self.tick)
+            self.messages.expire(self.tick)
+        
         # Update all animals
-        for animal in self.animals[:]:
-            animal.update()
+        with span("update.animals"):
+            self._update_animals(now)
         
         # Update time - LEBIH LAMBAT
         self.time_of_day += 0.2  # Dari 0.5 jadi 0.2
@@ -768,172 +3249,262 @@ class Farm:
             self.day += 1
             self.add_message(f"Hari ke-{self.day}!", BLUE)
         
-        # Update messages
-        for msg in self.messages[:]:
-            msg["timer"] -= 1
-            if msg["timer"] <= 0:
-                self.messages.remove(msg)
-        
         # Check missions (termasuk transform check)
         self._check_missions()
         
-        # Transform notification
-        for animal in self.animals:
-            if animal.is_transformed():
-                # Check kalau baru transform (belum ada notifikasi sebelumnya)
-                if not hasattr(animal, '_transform_notified'):
-                    animal._transform_notified = True
-                    species_name = animal.get_name()
-                    if "Ayam" in species_name:
-                        self.add_message("GOLDEN CHICKEN! Produce 2x lipat!", GOLD)
-                    elif "Sapi" in species_name:
-                        self.add_message("SUPER COW! Pink power!", PINK)
-                    elif "Domba" in species_name:
-                        self.add_message("RAINBOW SHEEP! Warna ajaib!", (255, 100, 255))
-            else:
-                if hasattr(animal, '_transform_notified'):
-                    delattr(animal, '_transform_notified')
+        # Autosave di batas tick - state konsisten
+        if self.autosaver is not None:
+            with span("update.autosave"):
+                self.autosaver.maybe_save(self)
     
-    def draw(self):
-        """Draw everything"""
-        # Sky gradient (day/night cycle)
-        time_ratio = self.time_of_day / 1000
-        if time_ratio < 0.5:  # Morning to afternoon
-            sky_color = (135, 206, 250)  # Light blue
-        else:  # Evening to night
-            night_progress = (time_ratio - 0.5) * 2
-            sky_color = (
-                int(135 - 105 * night_progress),
-                int(206 - 176 * night_progress),
-                int(250 - 180 * night_progress)
-            )
-        screen.fill(sky_color)
-        
-        # Ground
-        ground_rect = pygame.Rect(0, HEIGHT - 150, WIDTH, 150)
-        pygame.draw.rect(screen, GRASS_GREEN, ground_rect)
-        
-        # Grass details
-        for i in range(0, WIDTH, 30):
-            pygame.draw.line(screen, DARK_GREEN, (i, HEIGHT - 150), 
-                           (i + 10, HEIGHT - 140), 2)
-        
-        # Draw animals
-        for animal in self.animals:
-            animal.draw(screen)
+    def _sim_visible(self):
+        """Hewan di sekitar view kamera, atau None kalau kamera melihat seluruh dunia"""
+        view = self.camera.view_rect()
+        if view.contains(self.world):
+            return None
+        # Margin ekstra: hewan di luar bisa tertinggal sampai OFFSCREEN_TICKS pixel
+        return self.grid.visible(view, cull_margin() + OFFSCREEN_TICKS)
+    
+    def _update_animals(self, now):
+        """
+        Hewan di sekitar kamera di-update tiap tick; yang di luar bergiliran,
+        tiap OFFSCREEN_TICKS tick sekali dengan semua tick yang tertinggal.
+        HerdStore tetap menghitung semua hewan, hanya sinkron object yang bergiliran.
+        """
+        visible = self._sim_visible()
+        if self.herd is not None:
+            self.herd.step(now, visible, self.tick % OFFSCREEN_TICKS)
+            return
+        if visible is None and self._sim_synced:
+            for animal in self.animals[:]:
+                animal.update(now)
+            return
         
+        tick = self.tick
+        if self._sim_synced:
+            for animal in self.animals:
+                animal._sim_tick = tick - 1
+        self._sim_synced = visible is None  # Tick ini semua hewan menyusul
+        phase = tick % OFFSCREEN_TICKS
+        for index, animal in enumerate(self.animals[:]):
+            if visible is None or animal in visible or index % OFFSCREEN_TICKS == phase:
+                animal.update(now, tick - animal._sim_tick)
+                animal._sim_tick = tick
+    
+    def simulate(self, ticks):
+        """
+        Jalankan update() sebanyak ticks tanpa draw dan tanpa clock.tick,
+        jadi secepat CPU bisa. Dipakai untuk fast-forward / balancing.
+        """
+        for _ in range(ticks):
+            self.update()
+    
+    def simulate_days(self, days):
+        """Fast-forward sejumlah hari game (1 hari = TICKS_PER_DAY tick)"""
+        self.simulate(int(days * TICKS_PER_DAY))
+    
+    def _draw_overlays(self):
+        """Semua layer di atas hewan: UI, toko, tutorial, notifikasi, profiler"""
+        span = self.profiler.span
         # UI Panel
-        self._draw_ui()
+        with span("draw.ui"):
+            self._draw_ui()
         
         # Shop
         if self.show_shop:
-            self._draw_shop()
+            with span("draw.shop"):
+                self._draw_shop()
         
         # Tutorial
         if self.show_tutorial:
-            self._draw_tutorial()
+            with span("draw.tutorial"):
+                self._draw_tutorial()
         
         # Messages
+        with span("draw.messages"):
+            screen.blits(self._message_layout(), False)
+        
+        # Drag-box seleksi
+        if self._drag_rect is not None:
+            pygame.draw.rect(screen, WHITE, self._drag_rect, 1)
+        
+        if self.profiler.show_overlay:
+            self._draw_profiler()
+    
+    def _draw_profiler(self):
+        """Overlay profiling: histogram frame time, ms per fase, counter"""
+        profiler = self.profiler
+        panel = pygame.Rect(PROFILER_PANEL)
+        pygame.draw.rect(screen, (0, 0, 0), panel)
+        pygame.draw.rect(screen, LIGHT_BLUE, panel, 2)
+        
+        averages = profiler.averages()
+        frame_ms = averages.get("frame_ms", 0.0)
+        fps = 1000 / frame_ms if frame_ms else 0
+        lines = [
+            (f"Frame {frame_ms:.2f} ms ({fps:.0f} FPS)", WHITE),
+            (f"Hewan {len(self.animals)} | Draw call {self.renderer.last_draw_calls}", WHITE),
+            (f"Tampil {self.renderer.last_visible} | cull {self.renderer.last_culled}"
+             f" | siluet {self.renderer.last_simplified}", WHITE),
+            (f"Cache teks {text_cache.hit_rate():.0%} | sprite {sprite_cache.hit_rate():.0%}", WHITE),
+        ]
+        if self.autosaver is not None:
+            stats = self.autosaver.stats()
+            lines.append((f"Autosave {stats['saves']}x | capture {stats['capture_ms']:.1f} ms"
+                          f" | tulis {stats['write_ms']:.1f} ms", WHITE))
+        # Fase terlama dulu
+        phases = sorted(((key, value) for key, value in averages.items()
+                         if key.split(".")[0] in PROFILER_PHASES),
+                        key=lambda item: -item[1])
+        for name, ms in phases[:6]:
+            lines.append((f"{name}: {ms:.2f} ms", YELLOW))
+        
+        y = panel.top + 8
+        for text, color in lines:
+            screen.blit(render_text(font_small, text, color), (panel.left + 10, y))
+            y += 22
+        
+        # Histogram frame time (1 px per frame, garis = 16.7 ms / 60 FPS)
+        base_y = panel.bottom - 8
+        max_ms = 50.0
+        height = 60
+        x = panel.left + 10
+        for record in list(profiler.history)[-(panel.width - 20):]:
+            ms = record["frame_ms"]
+            color = GREEN if ms <= 1000 / FPS else YELLOW if ms <= 2000 / FPS else RED
+            bar = int(min(ms, max_ms) / max_ms * height)
+            pygame.draw.line(screen, color, (x, base_y), (x, base_y - bar))
+            x += 1
+        target_y = base_y - int((1000 / FPS) / max_ms * height)
+        pygame.draw.line(screen, GRAY, (panel.left + 10, target_y), (panel.right - 10, target_y))
+    
+    def _message_layout(self):
+        """(surface, rect) per notifikasi yang tampil, dari bawah ke atas"""
+        layout = []
         y_offset = HEIGHT - 180
-        for msg in self.messages:
-            text_surf = font_small.render(msg["text"], True, msg["color"])
-            text_rect = text_surf.get_rect(center=(WIDTH // 2, y_offset))
-            # Background
-            bg_rect = text_rect.inflate(20, 10)
-            pygame.draw.rect(screen, (0, 0, 0, 150), bg_rect, border_radius=10)
-            screen.blit(text_surf, text_rect)
+        for note in self.messages.visible():
+            surface = note.get_surface()
+            layout.append((surface, surface.get_rect(center=(WIDTH // 2, y_offset))))
             y_offset -= 35
-        
-        pygame.display.flip()
+        return layout
+    
+    def _ui_regions(self):
+        """
+        {nama: (rect, signature)} untuk setiap panel UI.
+        DirtyRenderer menggambar ulang panel hanya kalau signature-nya berubah.
+        """
+        regions = {
+            "top": (pygame.Rect(0, 0, WIDTH, 110),  # Teks hari sedikit keluar dari bar
+                    (self.money, self.day, *(self.product_totals[key] for key in PRODUCT_KEYS),
+                     self.timestep.time_scale)),
+            "missions": (pygame.Rect(10, HEIGHT - 227, 400, 210),
+                         tuple(mission["completed"] for mission in self.missions)),
+            "controls": (pygame.Rect(WIDTH - 360, HEIGHT - 227, 340, 210), None),
+        }
+        animal = self.selected_animal
+        if animal:
+            regions["info"] = (pygame.Rect(WIDTH - 365, 135, 350, 230), (
+                animal.get_name(), len(self.selection), animal.is_transformed(),
+                int(animal.get_health()), int(animal.get_happiness()),
+                int(animal.get_hunger()), int(animal.get_energy())))
+        if self.show_shop:
+            regions["shop"] = (self._shop_rect(),
+                               tuple(self.money >= species.shop_price for species in SHOP_SPECIES))
+        if self._drag_rect is not None:
+            regions["drag"] = (pygame.Rect(self._drag_rect).inflate(2, 2), self._drag_rect)
+        if self.profiler.show_overlay:
+            regions["profiler"] = (pygame.Rect(PROFILER_PANEL), self.profiler.frame_index)
+        if self.show_tutorial:
+            regions["tutorial"] = (pygame.Rect(WIDTH//4, 120, WIDTH//2, 540), None)
+            regions["tutorial_start"] = (pygame.Rect(WIDTH//2 - 200, HEIGHT - 110, 400, 60), None)
+        return regions
+    
+    def view_rect(self):
+        """Area dunia yang terlihat di layar (dipakai untuk culling)"""
+        return self.camera.view_rect()
+    
+    def view_zoom(self):
+        """Skala dunia -> layar (1.0 = ukuran asli), dipakai LodPolicy"""
+        return self.camera.zoom
+    
+    def draw(self):
+        """Draw everything (lewat dirty-rect renderer)"""
+        if self.headless:
+            return
+        self.renderer.render(self, screen)
 
     def _draw_ui(self):
-        """Draw UI elements"""
+        """Draw UI elements - panel translucent dari panel_cache + teks yang berubah"""
         # Top bar background
-        pygame.draw.rect(screen, (30, 30, 30, 230), (0, 0, WIDTH, 100))
+        screen.blit(get_panel("top", (WIDTH, 100), (30, 30, 30, 230)), (0, 0))
         
         # Money - LEBIH BESAR
-        money_text = font_title.render(f"Uang ${self.money}", True, GOLD)
+        money_text = render_text(font_title, f"Uang ${self.money}", GOLD)
         screen.blit(money_text, (20, 15))
         
         # Day
-        day_text = font_large.render(f"Hari {self.day}", True, WHITE)
+        day_text = render_text(font_large, f"Hari {self.day}", WHITE)
         screen.blit(day_text, (20, 65))
         
+        # Fast-forward indicator
+        if self.timestep.time_scale != 1:
+            speed_text = render_text(font_medium, f">> x{self.timestep.time_scale}", LIGHT_BLUE)
+            screen.blit(speed_text, (day_text.get_width() + 40, 72))
+        
         # Stats - KANAN ATAS
         stats_x = WIDTH - 450
         stats_y = 20
         
-        # Background untuk stats
+        # Background untuk stats + label produk dari registry (statis)
         stats_bg = pygame.Rect(stats_x - 10, stats_y - 10, 500, 80)
-        pygame.draw.rect(screen, (50, 50, 50, 200), stats_bg, border_radius=10)
-        
-        # Telur
-        egg_label = font_medium.render("TELUR:", True, YELLOW)
-        screen.blit(egg_label, (stats_x, stats_y))
-        egg_count = font_large.render(str(self.total_eggs), True, WHITE)
-        screen.blit(egg_count, (stats_x, stats_y + 30))
-        
-        # Susu
-        milk_label = font_medium.render("SUSU:", True, LIGHT_BLUE)
-        screen.blit(milk_label, (stats_x + 130, stats_y))
-        milk_count = font_large.render(str(self.total_milk), True, WHITE)
-        screen.blit(milk_count, (stats_x + 130, stats_y + 30))
-        
-        # Wol
-        wool_label = font_medium.render("WOL:", True, WHITE)
-        screen.blit(wool_label, (stats_x + 260, stats_y))
-        wool_count = font_large.render(str(self.total_wool), True, WHITE)
-        screen.blit(wool_count, (stats_x + 260, stats_y + 30))
-        
-        # Missions - KIRI BAWAH
-        mission_x = 20
-        mission_y = HEIGHT - 220
-        
-        # Mission background
-        mission_bg = pygame.Rect(mission_x - 10, mission_y - 7, 400, 210)
-        pygame.draw.rect(screen, (20, 20, 40, 200), mission_bg, border_radius=10)
-        
-        mission_title = font_medium.render("MISI", True, GOLD)
-        screen.blit(mission_title, (mission_x, mission_y))
-        mission_y += 40
-        
-        for mission in self.missions:
-            color = GREEN if mission["completed"] else WHITE
-            status = "[V]" if mission["completed"] else "[X]"
-            mission_text = font_small.render(
-                f"{status} {mission['text']}", 
-                True, color
-            )
-            screen.blit(mission_text, (mission_x, mission_y))
-            
-            # Reward
-            reward_text = font_small.render(f"+${mission['reward']}", True, YELLOW)
-            screen.blit(reward_text, (mission_x + 280, mission_y + 2))
-            mission_y += 35
+        step = min(130, 480 // len(PRODUCT_KEYS))
+        def draw_stats(panel):
+            for index, definition in enumerate(PRODUCT_SPECIES.values()):
+                label = render_text(font_medium, f"{definition.product_name.upper()}:",
+                                    definition.product_color)
+                panel.blit(label, (10 + index * step, 10))
+        screen.blit(get_panel("stats", stats_bg.size, (50, 50, 50, 200), radius=10,
+                              draw=draw_stats), stats_bg)
+        
+        # Counter per produk (telur / susu / wol / ...)
+        for index, key in enumerate(PRODUCT_KEYS):
+            count = render_text(font_large, str(self.product_totals[key]), WHITE)
+            screen.blit(count, (stats_x + index * step, stats_y + 30))
+        
+        # Missions - KIRI BAWAH (seluruh isi statis sampai ada misi selesai)
+        mission_bg = pygame.Rect(10, HEIGHT - 227, 400, 210)
+        def draw_missions(panel):
+            panel.blit(render_text(font_medium, "MISI", GOLD), (10, 7))
+            y = 47
+            for mission in self.missions:
+                color = GREEN if mission["completed"] else WHITE
+                status = "[V]" if mission["completed"] else "[X]"
+                panel.blit(render_text(font_small, f"{status} {mission['text']}", color), (10, y))
+                
+                # Reward
+                panel.blit(render_text(font_small, f"+${mission['reward']}", YELLOW), (290, y + 2))
+                y += 35
+        completed = tuple(mission["completed"] for mission in self.missions)
+        screen.blit(get_panel(("missions", completed), mission_bg.size, (20, 20, 40, 200),
+                              radius=10, draw=draw_missions), mission_bg)
         
         # Controls - KANAN BAWAH
-        controls_x = WIDTH - 350
-        controls_y = HEIGHT - 220
-        
-        # Control background
-        control_bg = pygame.Rect(controls_x - 10, controls_y - 7, 340, 210)
-        pygame.draw.rect(screen, (20, 40, 20, 200), control_bg, border_radius=10)
-        
-        controls_title = font_medium.render("KONTROL", True, GREEN)
-        screen.blit(controls_title, (controls_x, controls_y))
-        controls_y += 40
-        
-        controls = [
-            "Klik = Pilih hewan",
-            "F = Kasih makan ($5)",
-            "P = Elus-elus (GRATIS!)",
-            "C = Ambil hasil",
-            "S = Buka toko"
-        ]
-        for text in controls:
-            control_text = font_small.render(text, True, WHITE)
-            screen.blit(control_text, (controls_x, controls_y))
-            controls_y += 35
+        control_bg = pygame.Rect(WIDTH - 360, HEIGHT - 227, 340, 210)
+        def draw_controls(panel):
+            panel.blit(render_text(font_medium, "KONTROL", GREEN), (10, 7))
+            controls = [
+                "Klik = Pilih hewan",
+                f"F = Kasih makan (${FEED_COST})",
+                "P = Elus-elus (GRATIS!)",
+                "C = Ambil hasil",
+                "S = Buka toko"
+            ]
+            y = 47
+            for text in controls:
+                panel.blit(render_text(font_small, text, WHITE), (10, y))
+                y += 35
+        screen.blit(get_panel("controls", control_bg.size, (20, 40, 20, 200), radius=10,
+                              draw=draw_controls), control_bg)
         
         # Selected animal info - KANAN TENGAH
         if self.selected_animal:
@@ -942,11 +3513,13 @@ class Farm:
             
             # Background panel - LEBIH MENONJOL
             panel_rect = pygame.Rect(info_x - 15, info_y - 15, 350, 230)
-            pygame.draw.rect(screen, (60, 30, 80, 240), panel_rect, border_radius=15)
-            pygame.draw.rect(screen, GOLD, panel_rect, 4, border_radius=15)
+            screen.blit(get_panel("info", panel_rect.size, (60, 30, 80, 240), radius=15,
+                                  border=GOLD, border_width=4), panel_rect)
             
-            name_text = font_large.render(f"✨ {self.selected_animal.get_name()}", 
-                                          True, GOLD)
+            name = self.selected_animal.get_name()
+            if len(self.selection) > 1:
+                name += f" +{len(self.selection) - 1}"
+            name_text = render_text(font_large, f"✨ {name}", GOLD)
             screen.blit(name_text, (info_x, info_y))
             info_y += 45
             
@@ -959,119 +3532,268 @@ class Farm:
             
             # Transform status
             if self.selected_animal.is_transformed():
-                transform_text = font_medium.render("TRANSFORMASI!", True, YELLOW)
+                transform_text = render_text(font_medium, "TRANSFORMASI!", YELLOW)
                 screen.blit(transform_text, (info_x + 80, info_y))
                 info_y += 35
             
             for stat in stats:
-                stat_text = font_medium.render(stat, True, WHITE)
+                stat_text = render_text(font_medium, stat, WHITE)
                 screen.blit(stat_text, (info_x, info_y))
                 info_y += 32
     
+    def _shop_button_rect(self, index):
+        return pygame.Rect(WIDTH - 250, SHOP_BUTTON_TOP + index * SHOP_BUTTON_STEP, 230, 50)
+    
+    def _shop_rect(self):
+        """Panel toko - tinggi menyesuaikan jumlah species yang dijual"""
+        return pygame.Rect(WIDTH - 280, 50, 260, 170 + SHOP_BUTTON_STEP * len(SHOP_SPECIES))
+    
     def _draw_shop(self):
-        """Draw shop interface"""
-        # Shop background
-        shop_rect = pygame.Rect(WIDTH - 280, 50, 260, 350)
-        pygame.draw.rect(screen, (30, 30, 50, 240), shop_rect, border_radius=15)
-        pygame.draw.rect(screen, YELLOW, shop_rect, 3, border_radius=15)
-        
-        # Title
-        title = font_large.render("TOKO", True, YELLOW)
-        screen.blit(title, (WIDTH - 250, 60))
-        
-        # Items
-        items = [
-            ("Ayam", 50, 120),
-            ("Sapi", 100, 180),
-            ("Domba", 80, 240)
-        ]
-        
-        for name, price, y in items:
-            # Button background
-            button_rect = pygame.Rect(WIDTH - 250, y, 230, 50)
-            color = GREEN if self.money >= price else GRAY
-            pygame.draw.rect(screen, color, button_rect, border_radius=10)
-            pygame.draw.rect(screen, WHITE, button_rect, 2, border_radius=10)
+        """Draw shop interface - satu panel cache per kombinasi tombol aktif/abu-abu"""
+        shop_rect = self._shop_rect()
+        origin = shop_rect.topleft
+        affordable = tuple(self.money >= species.shop_price for species in SHOP_SPECIES)
+        
+        def draw_shop(panel):
+            # Title
+            title = render_text(font_large, "TOKO", YELLOW)
+            panel.blit(title, (WIDTH - 250 - origin[0], 60 - origin[1]))
+            
+            # Items (dari registry species)
+            for i, species in enumerate(SHOP_SPECIES):
+                # Button background
+                button_rect = self._shop_button_rect(i).move(-origin[0], -origin[1])
+                color = GREEN if affordable[i] else GRAY
+                pygame.draw.rect(panel, color, button_rect, border_radius=10)
+                pygame.draw.rect(panel, WHITE, button_rect, 2, border_radius=10)
+                
+                # Text
+                item_text = render_text(font_medium, f"{species.name} - ${species.shop_price}", WHITE)
+                panel.blit(item_text, item_text.get_rect(center=button_rect.center))
             
-            # Text
-            item_text = font_medium.render(f"{name} - ${price}", True, WHITE)
-            text_rect = item_text.get_rect(center=button_rect.center)
-            screen.blit(item_text, text_rect)
+            # Close hint
+            hint = render_text(font_small, "Tekan S untuk tutup", WHITE)
+            hint_y = self._shop_button_rect(len(SHOP_SPECIES)).top + 10
+            panel.blit(hint, (WIDTH - 250 - origin[0], hint_y - origin[1]))
         
-        # Close hint
-        hint = font_small.render("Tekan S untuk tutup", True, WHITE)
-        screen.blit(hint, (WIDTH - 250, 310))
+        screen.blit(get_panel(("shop", affordable), shop_rect.size, (30, 30, 50, 240), radius=15,
+                              border=YELLOW, border_width=3, draw=draw_shop), origin)
     
     def _draw_tutorial(self):
-        """Draw tutorial overlay"""
-        # Semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((0, 0, 0))
-        screen.blit(overlay, (0, 0))
-        
-        # Tutorial box - LEBIH PANJANG
-        box_rect = pygame.Rect(WIDTH//4, 120, WIDTH//2, 540)
-        pygame.draw.rect(screen, (40, 40, 60), box_rect, border_radius=20)
-        pygame.draw.rect(screen, YELLOW, box_rect, 5, border_radius=20)
-        
-        # Title
-        title = font_title.render("Polymor-Farm", True, GOLD)
-        title_rect = title.get_rect(center=(WIDTH//2, 170))
-        screen.blit(title, title_rect)
-        
-        # Instructions
-        instructions = [
-            "Rawat hewan dengan baik!",
-            "",
-            "F = Kasih makan ($5)",
-            "P = Elus-elus (gratis)",
-            "C = Ambil hasil",
-            "",
-            "POLYMORPHISM MAGIC:",
-            "Happiness > 70% + Kenyang > 70%",
-            "= TRANSFORMASI! ",
-            "",
-            "Ayam -> Golden Chicken",
-            "Sapi -> Super Cow", 
-            "Domba -> Rainbow Sheep",
-            "",
-            "S = Toko || Selesaikan misi!"
-        ]
-        
-        y_offset = 230
-        for line in instructions:
-            text = font_medium.render(line, True, WHITE)
-            text_rect = text.get_rect(center=(WIDTH//2, y_offset))
-            screen.blit(text, text_rect)
-            y_offset += 28
-        
-        # Start hint 
-        start_text = font_medium.render("Tekan SPACE untuk mulai!", True, WHITE)
-        start_rect = start_text.get_rect(center=(WIDTH//2, HEIGHT - 80))
-        
-        # Background untuk tombol
-        start_bg = start_rect.inflate(30, 15)
-        pygame.draw.rect(screen, (0, 100, 0), start_bg, border_radius=10)
-        pygame.draw.rect(screen, YELLOW, start_bg, 3, border_radius=10)
+        """Draw tutorial overlay - overlay gelap + kotak tutorial di-bake jadi satu Surface"""
+        def draw_tutorial(overlay):
+            # Tutorial box - LEBIH PANJANG
+            box_rect = pygame.Rect(WIDTH//4, 120, WIDTH//2, 540)
+            pygame.draw.rect(overlay, (40, 40, 60), box_rect, border_radius=20)
+            pygame.draw.rect(overlay, YELLOW, box_rect, 5, border_radius=20)
+            
+            # Title
+            title = render_text(font_title, "Polymor-Farm", GOLD)
+            overlay.blit(title, title.get_rect(center=(WIDTH//2, 170)))
+            
+            # Instructions - syarat dan hasil transform dari registry species
+            rules = {(d.min_happiness, d.min_hunger) for d in SPECIES.values()}
+            if len(rules) == 1:
+                happiness, hunger = rules.pop()
+                conditions = [f"Happiness > {happiness}% + Kenyang > {hunger}%"]
+            else:
+                conditions = [f"{d.name}: Happiness > {d.min_happiness}% + Kenyang > {d.min_hunger}%"
+                              for d in SPECIES.values()]
+            instructions = [
+                "Rawat hewan dengan baik!",
+                "",
+                f"F = Kasih makan (${FEED_COST})",
+                "P = Elus-elus (gratis)",
+                "C = Ambil hasil",
+                "",
+                "POLYMORPHISM MAGIC:",
+                *conditions,
+                "= TRANSFORMASI! ",
+                "",
+                *(f"{d.name} -> {d.transform_name}" for d in SPECIES.values()),
+                "",
+                "S = Toko || Selesaikan misi!"
+            ]
+            
+            # Jarak baris menyusut kalau registry punya banyak species
+            y_offset = 230
+            line_height = min(28, 392 // max(1, len(instructions) - 1))
+            for line in instructions:
+                text = render_text(font_medium, line, WHITE)
+                overlay.blit(text, text.get_rect(center=(WIDTH//2, y_offset)))
+                y_offset += line_height
+            
+            # Start hint 
+            start_text = render_text(font_medium, "Tekan SPACE untuk mulai!", WHITE)
+            start_rect = start_text.get_rect(center=(WIDTH//2, HEIGHT - 80))
+            
+            # Background untuk tombol
+            start_bg = start_rect.inflate(30, 15)
+            pygame.draw.rect(overlay, (0, 100, 0), start_bg, border_radius=10)
+            pygame.draw.rect(overlay, YELLOW, start_bg, 3, border_radius=10)
+            
+            overlay.blit(start_text, start_rect)
         
-        screen.blit(start_text, start_rect)
+        # Semi-transparent overlay (alpha 200) sekaligus isi tutorial
+        screen.blit(get_panel("tutorial", (WIDTH, HEIGHT), (0, 0, 0, 200), draw=draw_tutorial), (0, 0))
     
     def run(self):
         """Main game loop"""
+        if self.headless:
+            raise RuntimeError("Farm headless tidak punya window - pakai simulate()")
+        
+        profiler = self.profiler
         running = True
         while running:
-            running = self.handle_events()
-            if not self.show_tutorial:
-                self.update()
-            self.draw()
-            clock.tick(FPS)
+            frame_ms = clock.tick(FPS)
+            profiler.begin_frame()
+            with profiler.span("handle_events"):
+                running = self.handle_events()
+            
+            ticks = 0
+            with profiler.span("update"):
+                if self.show_tutorial:
+                    self.timestep.reset()  # Game time berhenti selama tutorial
+                else:
+                    ticks = self.timestep.run(frame_ms / 1000, self.update)
+            self.render_alpha = self.timestep.alpha
+            
+            with profiler.span("draw"):
+                self.draw()
+            profiler.end_frame(
+                animals=len(self.animals),
+                ticks=ticks,
+                draw_calls=self.renderer.last_draw_calls,
+                visible=self.renderer.last_visible,
+                culled=self.renderer.last_culled,
+                lod_simple=self.renderer.last_simplified,
+                text_cache_hit=text_cache.hit_rate(),
+                sprite_cache_hit=sprite_cache.hit_rate(),
+            )
         
+        if self.recorder is not None:
+            self.recorder.save(self)
+        if self.autosaver is not None:
+            self.autosaver.close()
         pygame.quit()
         sys.exit()
 
 
 # ==================== MAIN ====================
+def parse_size(text):
+    """"LEBARxTINGGI" -> (lebar, tinggi), None kalau formatnya salah"""
+    try:
+        size = tuple(int(value) for value in text.lower().split("x"))
+    except ValueError:
+        return None
+    if len(size) != 2 or min(size) <= 0:
+        return None
+    return size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Polymor-Farm")
+    parser.add_argument("--headless", action="store_true",
+                        help="jalankan simulasi tanpa window")
+    parser.add_argument("--days", type=float, default=1,
+                        help="jumlah hari yang disimulasikan (mode headless)")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="pakai HerdStore NumPy untuk update hewan")
+    parser.add_argument("--load", metavar="PATH", help="mulai dari file save")
+    parser.add_argument("--seed", type=int, help="seed RNG farm (default acak)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="rekam input sesi ke PATH (JSON) untuk --replay")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="putar ulang rekaman tanpa window secepat mungkin")
+    parser.add_argument("--autosave", type=float, metavar="DETIK",
+                        help=f"interval autosave ke {AUTOSAVE_PATH} (0 = mati; "
+                             f"default {AUTOSAVE_SECONDS} di game, mati di headless)")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="aktifkan profiler dan export rolling ke PATH (.csv/.json)")
+    parser.add_argument("--window", metavar="LEBARxTINGGI",
+                        help=f"ukuran window; game tetap dirender {WIDTH}x{HEIGHT} lalu di-scale")
+    parser.add_argument("--smooth", action="store_true",
+                        help="pakai smoothscale saat scaling (lebih halus, lebih lambat)")
+    parser.add_argument("--lod-crowd", type=int, default=LOD_CROWD_THRESHOLD, metavar="N",
+                        help="gambar siluet kalau hewan terlihat lebih dari N (0 = selalu)")
+    parser.add_argument("--world", metavar="LEBARxTINGGI",
+                        help=f"ukuran dunia farm (minimal {WIDTH}x{HEIGHT}); "
+                             "panah = geser kamera, scroll / - = = zoom")
+    args = parser.parse_args(argv)
+    if args.record and args.load:
+        parser.error("--record harus mulai dari farm baru (tanpa --load)")
+    
+    def load_or_exit(game, path):
+        try:
+            game.load(path)
+        except (OSError, SnapshotError) as error:
+            parser.error(f"--load gagal: {error}")
+    
+    world_size = None
+    if args.world:
+        world_size = parse_size(args.world)
+        if world_size is None:
+            parser.error(f"--world harus berbentuk LEBARxTINGGI, minimal {WIDTH}x{HEIGHT}")
+        try:
+            check_world_size(world_size)
+        except ValueError as error:
+            parser.error(f"--world: {error}")
+    
+    if args.replay:
+        log = load_replay(args.replay)
+        profiler = None
+        if args.profile:
+            profiler = Profiler(history=max(1, log["end_tick"]))
+            profiler.toggle()
+        start = time.perf_counter()
+        game = replay_session(log, profiler)
+        elapsed = time.perf_counter() - start
+        match = game.state_digest() == log["digest"]
+        print(f"Replay {log['end_tick']} tick ({len(log['actions'])} input) dalam {elapsed:.2f} s "
+              f"({log['end_tick'] / max(elapsed, 1e-9):.0f} tick/s) | "
+              f"state {'SAMA' if match else 'BERBEDA'} dengan rekaman")
+        if profiler is not None:
+            print(f"Profil disimpan: {profiler.export(args.profile)}")
+        if not match:
+            sys.exit(1)
+        return
+    
+    if args.headless:
+        game = Farm(vectorized=args.vectorized, headless=True, seed=args.seed,
+                    world_size=world_size)
+        if args.load:
+            load_or_exit(game, args.load)
+        game.show_tutorial = False
+        if args.autosave:
+            game.autosaver = AutoSaver(interval=args.autosave)
+        game.simulate_days(args.days)
+        if game.autosaver is not None:
+            game.autosaver.close()
+        products = " | ".join(f"{PRODUCT_SPECIES[key].product_name.title()} {game.product_totals[key]}"
+                              for key in PRODUCT_KEYS)
+        print(f"Hari {game.day} | Uang ${game.money} | Hewan {len(game.animals)} | {products}")
+        return
+    
+    if args.window:
+        window_size = parse_size(args.window)
+        if window_size is None:
+            parser.error("--window harus berbentuk LEBARxTINGGI, misal 1920x1080")
+        init_display(window_size, smooth=args.smooth)
+    game = Farm(vectorized=args.vectorized, seed=args.seed, world_size=world_size)
+    if args.load:
+        load_or_exit(game, args.load)
+    if args.record:
+        game.recorder = InputRecorder(game, args.record)
+    autosave = AUTOSAVE_SECONDS if args.autosave is None else args.autosave
+    if autosave:
+        game.autosaver = AutoSaver(interval=autosave)
+    if args.profile:
+        game.profiler.export_path = args.profile
+        game.profiler.export_every = 600  # Tulis ulang tiap ~10 detik
+        game.profiler.toggle()
+    game.renderer.lod.crowd_threshold = args.lod_crowd
+    game.run()
+
+
 if __name__ == "__main__":
-    game = Farm()
-    game.run()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""
+Batch simulator Polymor-Farm untuk balancing ekonomi.
+
+Menjalankan banyak Farm headless paralel (ProcessPoolExecutor), masing-masing
+dengan seed dan policy pemain sendiri, selama N hari game. Worker hanya
+mengirim balik ringkasan kecil (kurva uang, tick misi selesai, jumlah
+transformasi) - bukan object hewan - dan hasilnya diagregasi per policy
+begitu tiap farm selesai.
+
+Contoh:
+    python batch_simulate.py --farms 1000 --days 3
+    python batch_simulate.py --policies idle investor --out hasil.jsonl --json ringkasan.json
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import UAS_Polymor_Farm as farm_module  # noqa: E402 - env harus di-set dulu
+
+DECISION_TICKS = 60  # Policy dijalankan tiap 1 detik game
+MAX_HERD = 30  # Batas beli untuk policy investor
+
+
+class BatchFarm(farm_module.Farm):
+    """Farm headless yang mencatat kapan misi selesai dan berapa kali transformasi"""
+    def __init__(self, seed, vectorized=False):
+        self.mission_ticks = {}
+        self.transform_events = 0
+        super().__init__(vectorized=vectorized, headless=True, seed=seed)
+        self.show_tutorial = False
+
+    def _on_animal_form_change(self, animal, transformed):
+        super()._on_animal_form_change(animal, transformed)
+        if transformed:
+            self.transform_events += 1
+
+    def _check_missions(self):
+        super()._check_missions()
+        if len(self.mission_ticks) < len(self.missions):
+            for mission in self.missions:
+                if mission["completed"] and mission["text"] not in self.mission_ticks:
+                    self.mission_ticks[mission["text"]] = self.tick
+
+
+# ==================== POLICIES ====================
+def policy_idle(farm):
+    """Tidak melakukan apa-apa (baseline)"""
+
+
+def policy_collector(farm):
+    """Hanya mengumpulkan produk"""
+    farm.collect_all(farm.animals)
+
+
+def policy_caretaker(farm):
+    """Kasih makan yang lapar, elus semua, kumpulkan produk (bulk action, satu pass)"""
+    hungry = [animal for animal in farm.animals if animal.get_hunger() < 50]
+    if hungry:
+        farm.feed_all(hungry)
+    farm.pet_all(farm.animals)
+    farm.collect_all(farm.animals)
+
+
+def policy_investor(farm):
+    """Caretaker + beli hewan bergiliran saat uang >= 300"""
+    policy_caretaker(farm)
+    index = len(farm.animals) % len(farm_module.SHOP_SPECIES)
+    if len(farm.animals) < MAX_HERD and farm.money >= 300:
+        farm.buy_animal(index)
+
+
+POLICIES = {
+    "idle": policy_idle,
+    "collector": policy_collector,
+    "caretaker": policy_caretaker,
+    "investor": policy_investor,
+}
+
+
+# ==================== WORKER ====================
+def run_farm(job):
+    """
+    Jalankan satu farm (dipanggil di proses worker).
+    Return dict kecil yang murah di-pickle.
+    """
+    policy_name, seed, days, samples_per_day, vectorized = job
+    policy = POLICIES[policy_name]
+    farm = BatchFarm(seed, vectorized)
+
+    total_ticks = int(days * farm_module.TICKS_PER_DAY)
+    sample_ticks = max(1, farm_module.TICKS_PER_DAY // samples_per_day)
+    money_curve = [farm.money]
+    while farm.tick < total_ticks:
+        if farm.tick % DECISION_TICKS == 0:
+            policy(farm)
+        farm.update()
+        if farm.tick % sample_ticks == 0:
+            money_curve.append(farm.money)
+
+    return {
+        "policy": policy_name,
+        "seed": seed,
+        "ticks": farm.tick,
+        "money": money_curve,
+        "mission_ticks": farm.mission_ticks,
+        "transforms": farm.transform_events,
+        "animals": len(farm.animals),
+        "products": dict(farm.product_totals),
+    }
+
+
+# ==================== AGREGASI ====================
+class PolicyStats:
+    """Agregat streaming per policy - tidak menyimpan hasil per farm"""
+    def __init__(self, name):
+        self.name = name
+        self.farms = 0
+        self.money_sum = []
+        self.final_money = []
+        self.mission_count = {}
+        self.mission_tick_sum = {}
+        self.transforms = 0
+        self.animal_days = 0.0
+
+    def add(self, result):
+        self.farms += 1
+        curve = result["money"]
+        if len(self.money_sum) < len(curve):
+            self.money_sum.extend([0] * (len(curve) - len(self.money_sum)))
+        for i, money in enumerate(curve):
+            self.money_sum[i] += money
+        self.final_money.append(curve[-1])
+        for text, tick in result["mission_ticks"].items():
+            self.mission_count[text] = self.mission_count.get(text, 0) + 1
+            self.mission_tick_sum[text] = self.mission_tick_sum.get(text, 0) + tick
+        self.transforms += result["transforms"]
+        self.animal_days += result["animals"] * result["ticks"] / farm_module.TICKS_PER_DAY
+
+    def summary(self):
+        farms = self.farms or 1
+        return {
+            "farms": self.farms,
+            "final_money_mean": sum(self.final_money) / farms,
+            "final_money_min": min(self.final_money, default=0),
+            "final_money_max": max(self.final_money, default=0),
+            "money_curve_mean": [total / farms for total in self.money_sum],
+            "missions": {
+                mission["text"]: {
+                    "completion_rate": self.mission_count.get(mission["text"], 0) / farms,
+                    "mean_days": (self.mission_tick_sum[mission["text"]]
+                                  / self.mission_count[mission["text"]]
+                                  / farm_module.TICKS_PER_DAY
+                                  if mission["text"] in self.mission_count else None),
+                }
+                for mission in farm_module.MISSIONS
+            },
+            "transforms_per_animal_day": self.transforms / (self.animal_days or 1),
+        }
+
+
+def print_summary(summaries):
+    for name, summary in summaries.items():
+        print(f"\n== {name} ({summary['farms']} farm) ==")
+        print(f"Uang akhir: rata-rata ${summary['final_money_mean']:.0f} "
+              f"(min ${summary['final_money_min']}, max ${summary['final_money_max']})")
+        print(f"Transformasi per hewan-hari: {summary['transforms_per_animal_day']:.3f}")
+        for text, mission in summary["missions"].items():
+            days = mission["mean_days"]
+            when = f"rata-rata hari {days:.2f}" if days is not None else "-"
+            print(f"  {text:24s} selesai {mission['completion_rate']:6.1%}  {when}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulasi batch banyak farm untuk balancing")
+    parser.add_argument("--farms", type=int, default=100, help="jumlah farm per policy")
+    parser.add_argument("--days", type=float, default=3, help="hari game per farm")
+    parser.add_argument("--policies", nargs="+", choices=sorted(POLICIES),
+                        default=list(POLICIES))
+    parser.add_argument("--seed", type=int, default=0, help="seed farm pertama (seed, seed+1, ...)")
+    parser.add_argument("--samples-per-day", type=int, default=10,
+                        help="titik kurva uang per hari game")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses (default CPU)")
+    parser.add_argument("--vectorized", action="store_true", help="pakai HerdStore NumPy")
+    parser.add_argument("--out", metavar="PATH", help="tulis hasil per farm (JSON lines)")
+    parser.add_argument("--json", metavar="PATH", help="simpan ringkasan per policy")
+    args = parser.parse_args(argv)
+
+    # Seed sama untuk setiap policy -> perbandingan berpasangan
+    jobs = [(policy, args.seed + i, args.days, args.samples_per_day, args.vectorized)
+            for policy in args.policies for i in range(args.farms)]
+    stats = {policy: PolicyStats(policy) for policy in args.policies}
+
+    start = time.perf_counter()
+    out = open(args.out, "w") if args.out else None
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = [executor.submit(run_farm, job) for job in jobs]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                stats[result["policy"]].add(result)
+                if out:
+                    out.write(json.dumps(result) + "\n")
+                if done % max(1, len(jobs) // 10) == 0:
+                    print(f"{done}/{len(jobs)} farm selesai ({time.perf_counter() - start:.1f} s)")
+    finally:
+        if out:
+            out.close()
+
+    summaries = {policy: stats[policy].summary() for policy in args.policies}
+    print_summary(summaries)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"farms": args.farms, "days": args.days, "seed": args.seed,
+                       "policies": summaries}, f, indent=2)
+        print(f"\nRingkasan disimpan ke {args.json}")
+
+
+if __name__ == "__main__":
+    main()
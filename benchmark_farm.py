@@ -0,0 +1,186 @@
+"""
+Benchmark Polymor-Farm untuk herd yang makin besar.
+
+Untuk setiap ukuran herd (default 10 / 100 / 1.000 / 10.000 hewan) diukur:
+waktu Farm.update per tick, waktu Farm.draw per frame, FPS teoritis
+(update + draw), bagian frame yang cukup partial redraw (dirty rect), waktu
+_handle_click, jumlah alokasi per tick dan peak memori.
+Random di-seed dan video pakai driver dummy, jadi hasilnya bisa diulang dan
+dibandingkan antar commit.
+
+Contoh:
+    python benchmark_farm.py --json hasil.json
+    python benchmark_farm.py --sizes 100 1000 --vectorized
+    python benchmark_farm.py --compare hasil_lama.json
+    python benchmark_farm.py --world 6000x4000   # dunia besar, kamera di pojok kiri-atas
+    python benchmark_farm.py --sizes 20 50 --min-partial 0.9   # exit 1 kalau dirty rect tidak jalan
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import UAS_Polymor_Farm as farm_module  # noqa: E402 - env harus di-set dulu
+
+
+def build_farm(size, seed, vectorized=False, world_size=None):
+    """Farm dengan size hewan (campuran Chicken/Cow/Sheep) di posisi acak dalam padang dunia"""
+    random.seed(seed)  # Posisi hewan di bawah
+    farm = farm_module.Farm(vectorized=vectorized, seed=seed, world_size=world_size)
+    farm.show_tutorial = False
+    species = (farm_module.Chicken, farm_module.Cow, farm_module.Sheep)
+    x0, x1, y0, y1 = farm.pasture
+    while len(farm.animals) < size:
+        cls = species[len(farm.animals) % 3]
+        x = random.randint(x0, x1)
+        y = random.randint(y0, y1)
+        farm.add_animal(cls(x, y))
+    return farm
+
+
+def time_per_call(func, repeat):
+    """Rata-rata ms per panggilan func()"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def count_allocations(func, repeat):
+    """Rata-rata blok memori baru per panggilan func() dan peak memori (byte)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(repeat):
+        func()
+    after = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    allocated = sum(stat.count_diff for stat in after.compare_to(before, "lineno")
+                    if stat.count_diff > 0)
+    return allocated / repeat, peak
+
+
+def run_size(size, args):
+    farm = build_farm(size, args.seed, args.vectorized, args.world)
+
+    # Warmup: isi cache teks/sprite dan jadwal event
+    for _ in range(args.warmup):
+        farm.update()
+        farm.draw()
+
+    update_ms = time_per_call(farm.update, args.ticks)
+
+    # Draw diukur sendiri-sendiri, update di antaranya tidak dihitung
+    renderer = farm.renderer
+    partial_before = renderer.partial_redraws
+    draw_total = 0.0
+    for _ in range(args.frames):
+        farm.update()
+        start = time.perf_counter()
+        farm.draw()
+        draw_total += time.perf_counter() - start
+    draw_ms = draw_total * 1000 / args.frames
+    partial_ratio = (renderer.partial_redraws - partial_before) / args.frames
+    frame_ms = update_ms + draw_ms
+
+    rng = random.Random(args.seed)
+    clicks = [(rng.randint(0, farm_module.WIDTH), rng.randint(0, farm_module.HEIGHT))
+              for _ in range(args.clicks)]
+    click_iter = iter(clicks * 2)
+    click_ms = time_per_call(lambda: farm._handle_click(next(click_iter)), args.clicks)
+
+    allocations, peak = count_allocations(farm.update, max(1, args.ticks // 10))
+
+    return {
+        "animals": len(farm.animals),
+        "update_ms": update_ms,
+        "draw_ms": draw_ms,
+        "frame_ms": frame_ms,
+        "fps": 1000 / frame_ms if frame_ms else float("inf"),
+        "partial_ratio": partial_ratio,
+        "click_us": click_ms * 1000,
+        "allocations_per_tick": allocations,
+        "peak_memory_bytes": peak,
+    }
+
+
+def print_table(results, baseline=None):
+    header = (f"{'hewan':>7} {'update ms':>10} {'draw ms':>9} {'fps':>8} {'partial':>8} "
+              f"{'klik us':>8} {'alloc/tick':>10} {'peak KB':>9}")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        line = (f"{result['animals']:>7} {result['update_ms']:>10.3f} {result['draw_ms']:>9.3f} "
+                f"{result['fps']:>8.1f} {result.get('partial_ratio', 0):>8.0%} "
+                f"{result['click_us']:>8.1f} "
+                f"{result['allocations_per_tick']:>10.1f} {result['peak_memory_bytes'] / 1024:>9.1f}")
+        old = (baseline or {}).get(result["animals"])
+        if old:
+            line += (f"   update {result['update_ms'] / old['update_ms']:.2f}x"
+                     f"  draw {result['draw_ms'] / max(old['draw_ms'], 1e-9):.2f}x")
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Polymor-Farm per ukuran herd")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--ticks", type=int, default=200, help="tick untuk ukur update")
+    parser.add_argument("--frames", type=int, default=60, help="frame untuk ukur draw")
+    parser.add_argument("--clicks", type=int, default=200, help="klik untuk ukur picking")
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--vectorized", action="store_true", help="pakai HerdStore NumPy")
+    parser.add_argument("--json", metavar="PATH", help="simpan hasil sebagai JSON")
+    parser.add_argument("--compare", metavar="PATH", help="JSON hasil lama untuk perbandingan")
+    parser.add_argument("--min-partial", type=float, metavar="RASIO",
+                        help="gagal (exit 1) kalau bagian frame partial redraw di bawah RASIO")
+    parser.add_argument("--world", metavar="LEBARxTINGGI",
+                        help="ukuran dunia (default layar); hewan di luar kamera disimulasikan kasar")
+    args = parser.parse_args(argv)
+    if args.world:
+        args.world = farm_module.parse_size(args.world)
+        if args.world is None:
+            parser.error("--world harus berbentuk LEBARxTINGGI")
+        try:
+            farm_module.check_world_size(args.world)
+        except ValueError as error:
+            parser.error(f"--world: {error}")
+
+    results = [run_size(size, args) for size in args.sizes]
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {r["animals"]: r for r in json.load(f)["results"]}
+    print_table(results, baseline)
+
+    if args.json:
+        report = {
+            "seed": args.seed,
+            "vectorized": args.vectorized,
+            "world": list(args.world) if args.world else None,
+            "ticks": args.ticks,
+            "frames": args.frames,
+            "results": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Hasil disimpan ke {args.json}")
+
+    if args.min_partial is not None:
+        failed = [r["animals"] for r in results if r["partial_ratio"] < args.min_partial]
+        if failed:
+            print(f"Partial redraw di bawah {args.min_partial:.0%} untuk herd {failed}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark memori Polymor-Farm: berapa byte yang dipakai per hewan.
+
+Contoh:
+    python benchmark_memory.py --count 20000
+
+Bandingkan dengan versi lain (misal sebelum __slots__):
+    git show <commit>:UAS_Polymor_Farm.py > /tmp/farm_old.py
+    python benchmark_memory.py --module /tmp/farm_old.py
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import sys
+import tracemalloc
+
+# Versi lama membuka window saat import - pakai driver dummy
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+def load_farm_module(path):
+    """Import UAS_Polymor_Farm dari path file tertentu"""
+    spec = importlib.util.spec_from_file_location("polymor_farm_bench", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure_species(cls, count):
+    """Byte per instance (tracemalloc) untuk count hewan dari class cls"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    animals = [cls(100 + i % 1000, 300 + i % 300) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    sample = animals[0]
+    shallow = sys.getsizeof(sample)
+    if hasattr(sample, "__dict__"):
+        shallow += sys.getsizeof(sample.__dict__)
+    return {
+        "bytes_per_animal": (after - before) / count,
+        "shallow_bytes": shallow,
+        "has_dict": hasattr(sample, "__dict__"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark memori per hewan")
+    parser.add_argument("--module", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                         "UAS_Polymor_Farm.py"),
+                        help="path UAS_Polymor_Farm.py yang diukur")
+    parser.add_argument("--count", type=int, default=10000, help="jumlah hewan per species")
+    parser.add_argument("--json", action="store_true", help="output JSON")
+    args = parser.parse_args(argv)
+
+    farm = load_farm_module(args.module)
+    results = {name: measure_species(getattr(farm, name), args.count)
+               for name in ("Chicken", "Cow", "Sheep")}
+
+    if args.json:
+        print(json.dumps({"module": args.module, "count": args.count, "species": results}, indent=2))
+        return
+
+    print(f"Module: {args.module} ({args.count} hewan per species)")
+    for name, result in results.items():
+        print(f"{name:8s} {result['bytes_per_animal']:8.1f} byte/hewan  "
+              f"(shallow {result['shallow_bytes']} byte, __dict__: {result['has_dict']})")
+
+
+if __name__ == "__main__":
+    main()
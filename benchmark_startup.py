@@ -0,0 +1,106 @@
+"""
+Benchmark startup Polymor-Farm: waktu import dan latency frame pertama.
+
+Setiap run dijalankan di interpreter baru (subprocess) supaya import dan
+inisialisasi pygame benar-benar dingin. Yang diukur:
+import pygame, import module game, Farm() (termasuk buka window),
+draw() pertama (load font, bake sprite, render teks) dan Farm headless.
+Juga dicatat subsystem pygame apa saja yang ikut menyala.
+
+Contoh:
+    python benchmark_startup.py --runs 10
+    python benchmark_startup.py --json startup.json
+
+Bandingkan dengan versi lain (misal sebelum lazy init):
+    git show <commit>:UAS_Polymor_Farm.py > /tmp/farm_old.py
+    cp species.json /tmp/    # versi dengan registry species butuh file ini
+    python benchmark_startup.py --module /tmp/farm_old.py
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ("import_pygame_ms", "import_module_ms", "farm_ms", "first_frame_ms",
+          "ready_ms", "headless_ms")
+
+
+def child(path):
+    """Satu pengukuran dingin (dijalankan di subprocess), print hasil sebagai JSON"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    start = time.perf_counter()
+    import pygame
+    after_pygame = time.perf_counter()
+
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("polymor_farm_startup", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    after_import = time.perf_counter()
+
+    farm = module.Farm()
+    after_farm = time.perf_counter()
+    farm.draw()
+    after_frame = time.perf_counter()
+
+    headless_start = time.perf_counter()
+    module.Farm(headless=True)
+    headless = time.perf_counter() - headless_start
+
+    subsystems = [name for name, init in (
+        ("display", pygame.display.get_init),
+        ("font", pygame.font.get_init),
+        ("mixer", pygame.mixer.get_init),
+        ("joystick", pygame.joystick.get_init),
+    ) if init()]
+    print(json.dumps({
+        "import_pygame_ms": (after_pygame - start) * 1000,
+        "import_module_ms": (after_import - after_pygame) * 1000,
+        "farm_ms": (after_farm - after_import) * 1000,
+        "first_frame_ms": (after_frame - after_farm) * 1000,
+        "ready_ms": (after_frame - start) * 1000,
+        "headless_ms": headless * 1000,
+        "subsystems": subsystems,
+    }))
+
+
+def run_once(path):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", path],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark import & frame pertama")
+    parser.add_argument("--module", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                         "UAS_Polymor_Farm.py"),
+                        help="path UAS_Polymor_Farm.py yang diukur")
+    parser.add_argument("--runs", type=int, default=5, help="jumlah proses dingin")
+    parser.add_argument("--json", metavar="PATH", help="simpan hasil sebagai JSON")
+    parser.add_argument("--child", metavar="PATH", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child)
+        return
+
+    runs = [run_once(args.module) for _ in range(args.runs)]
+    medians = {phase: statistics.median(run[phase] for run in runs) for phase in PHASES}
+
+    print(f"Module: {args.module} (median {args.runs} run)")
+    for phase in PHASES:
+        print(f"{phase:18s} {medians[phase]:8.1f} ms")
+    print(f"Subsystem aktif: {', '.join(runs[-1]['subsystems']) or '-'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"module": args.module, "runs": runs, "median": medians}, f, indent=2)
+        print(f"Hasil disimpan ke {args.json}")
+
+
+if __name__ == "__main__":
+    main()